@@ -2,12 +2,18 @@ import os
 import re
 import time
 import json
+import runpy
+import heapq
 import hashlib
 import logging
 import threading
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 import bencodepy
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -30,6 +36,57 @@ from app.log import logger
 from app.plugins import _PluginBase
 from app.schemas import NotificationType
 
+from .filters import ScanFilter
+from .fsutil import MountTable
+from . import hashworker
+from .hashcache import PieceHashCache
+from .hasher import (FileHashes, HashJob, HashResult, default_hash_processes, is_valid_v2_piece_length,
+                     run_hash_job)
+from .iosched import DeviceScheduler
+from .manifest import ContentManifest
+from .poller import PollingWatcher
+from .qbsession import QbittorrentSession
+from .release import ReleaseDetector
+from .resume import qbittorrent_fastresume, transmission_resume
+from .scanindex import STATE_DONE, STATE_EMPTY, STATE_PENDING, DirRecord, DirScan, ScanIndex
+from .stability import StabilityTracker
+from .submitter import SubmitBatcher, SubmitItem
+from .workqueue import WorkQueue
+
+
+@dataclass
+class TorrentProfile:
+    """種子輸出配置，每個站點一份，共用同一次分片哈希"""
+    # 配置名稱，默認配置為空，對應 <名稱>.torrent
+    name: str = ""
+    trackers: List[str] = field(default_factory=list)
+    source: str = ""
+    comment: str = ""
+    private: bool = True
+
+    def torrent_name(self, content_name: str) -> str:
+        """種子文件名"""
+        if not self.name:
+            return f"{content_name}.torrent"
+        return f"{content_name}.{self.name}.torrent"
+
+
+@dataclass
+class TorrentResult:
+    """生成的種子，添加到下載器等後續環節直接使用，無需重新讀取、解析種子文件"""
+    profile: TorrentProfile
+    content_path: str
+    torrent_path: str
+    # 種子文件內容
+    data: bytes
+    # 下載器中的種子ID：v1及混合種子為SHA-1，純v2種子為截斷的SHA-256
+    info_hash: str
+    # v2及混合種子的完整SHA-256，v1種子為空
+    info_hash_v2: str
+    # 按鍵排序的 info 字典
+    info: Dict[bytes, Any]
+    manifest: ContentManifest
+
 
 class PTSeeder(_PluginBase):
     # 插件名称
@@ -58,6 +115,13 @@ class PTSeeder(_PluginBase):
     _notify: bool = True
     _scheduler = None
     _observer = None
+    _poller: Optional[PollingWatcher] = None
+    _watch_mode: str = "auto"  # 文件监控方式: auto/inotify/polling
+    _poll_interval: int = 10  # 轮询间隔(秒)
+    _poll_budget: int = 100  # 每轮轮询的CPU时间预算(毫秒)
+    _stability: Optional[StabilityTracker] = None
+    _stable_min_wait: int = 10  # 文件监控: 内容静止多少秒后处理
+    _stable_max_wait: int = 7200  # 文件监控: 最长等待秒数
     _running: bool = False
     _lock = None
     
@@ -67,6 +131,18 @@ class PTSeeder(_PluginBase):
     _exclude_dirs: str = "@eaDir,@Recycle,.DS_Store"  # 排除目录
     _include_exts: str = ".mkv,.mp4,.avi,.rmvb,.mov,.ts,.m2ts"  # 包含扩展名
     _min_file_size: int = 100  # 最小文件大小(MB)
+    _exclude_patterns: str = ""  # 排除路径模式(glob)
+    _scan_filter: Optional[ScanFilter] = None
+    _release_depth: int = 0  # 发布目录层级, 0表示自动识别
+    _release_detector: Optional[ReleaseDetector] = None
+    _update_existing: bool = False  # 目录文件变化时增量更新种子
+    _scan_index_enabled: bool = True  # 扫描索引, 跳过未变化目录
+    _full_rescan: bool = False  # 下次执行完整扫描
+    _scan_index = None
+    _force_full_scan: bool = True  # 扫描设置变化后首次扫描为完整扫描
+    _scan_threads: int = 0  # 并行扫描线程数, 0表示自动(网络挂载并行, 本地顺序)
+    _scan_budget: int = 0  # 单次扫描时间预算(秒), 0表示不限制
+    _scan_budget_calls: int = 0  # 单次扫描stat调用预算, 0表示不限制
     
     # 种子设置
     _trackers: str = ""
@@ -74,12 +150,37 @@ class PTSeeder(_PluginBase):
     _private_torrent: bool = True  # 私有种子
     _source: str = ""  # 种子来源标识
     _comment: str = ""  # 种子注释
+    _site_profiles: str = ""  # 多站点输出配置
+    _profile_add_to_client: bool = True  # 站点种子添加到下载器
+    _profiles: List[TorrentProfile] = []
+    _torrent_version: str = "v1"  # 种子格式: v1/v2/hybrid
+    
+    # 性能设置
+    _hash_workers: int = 0  # 哈希线程数, 0表示自动
+    _hash_mmap: bool = False  # 使用内存映射读取本地文件
+    _hash_readahead: int = 0  # 预读分片数, 0表示自动
+    _hash_drop_cache: bool = True  # 读取后释放页缓存
+    _hash_cache_enabled: bool = True  # 分片哈希缓存
+    _hash_cache_size: int = 64  # 分片哈希缓存上限(MB)
+    _hash_cache = None
+    _hash_cache_path: str = ""
+    _hash_backend: str = "thread"  # 哈希执行方式: thread/process
+    _hash_processes: int = 0  # 哈希进程数, 0表示自动
+    _process_pool = None
+    _pool_lock = threading.Lock()
+    _io_concurrency: int = 1  # 每个设备同时哈希的任务数
+    _io_scheduler = None
+    _queue_workers: int = 0  # 处理队列工作线程数, 0表示自动
+    _queue_limit: int = 100  # 处理队列上限, 超出时提交方等待, 0表示不限制
+    _work_queue: Optional[WorkQueue] = None
     
     # 下载器设置
     _client_type: str = "qbittorrent"
     _add_to_client: bool = True  # 是否添加到下载器
     _auto_start: bool = False  # 自动开始下载
     _skip_check: bool = True  # 跳过校验
+    _submit_window: float = 2  # 提交批处理窗口(秒), 窗口内完成的种子合并提交, 0表示不等待
+    _submitter: Optional[SubmitBatcher] = None
     
     # qBittorrent 设置
     _qb_url: str = "http://localhost:8080"
@@ -87,6 +188,9 @@ class PTSeeder(_PluginBase):
     _qb_password: str = "adminadmin"
     _qb_category: str = ""  # qB 分类
     _qb_save_path: str = ""  # qB 保存路径
+    _qb_fastresume: bool = False  # 在种子旁生成 .fastresume 快速恢复数据
+    _qb_bt_backup: str = ""  # qB BT_backup 目录, 设置时按种子ID写入种子及快速恢复数据
+    _qb_session: Optional[QbittorrentSession] = None  # 长连接会话, 配置变化时重建
     
     # Transmission 设置
     _tr_host: str = "localhost"
@@ -94,6 +198,8 @@ class PTSeeder(_PluginBase):
     _tr_username: str = ""
     _tr_password: str = ""
     _tr_download_dir: str = ""  # TR 下载目录
+    _tr_resume: bool = False  # 在种子旁生成 .resume 恢复数据
+    _tr_resume_dir: str = ""  # TR resume 目录, 设置时写入恢复数据并将种子写入同级 torrents 目录
     
     # 种子标签和高级设置
     _tags: str = "PT,AutoSeed"  # 默认标签
@@ -129,6 +235,32 @@ class PTSeeder(_PluginBase):
         # 更新配置
         self._update_config()
         
+        # 解析种子输出配置
+        self._profiles = self._parse_profiles()
+        
+        # 编译扫描过滤规则
+        self._scan_filter = ScanFilter(exclude_dirs=self._exclude_dirs,
+                                       include_exts=self._include_exts,
+                                       min_file_size=self._min_file_size,
+                                       exclude_patterns=self._exclude_patterns)
+        self._release_detector = ReleaseDetector(self._release_depth)
+        
+        # 启用时创建处理队列、哈希缓存与扫描索引，停用时由手动运行按需创建
+        if self._enabled:
+            self._init_runtime()
+        
+        # 新种子按批提交到下载器，停用或不添加到下载器时不启动提交线程
+        if self._enabled and self._add_to_client:
+            self._submitter = SubmitBatcher(self._submit_batch, window=self._submit_window)
+            self._submitter.start()
+        
+        # 影响扫描结果的设置变化后，首次扫描为完整扫描并从头开始；重启或无关设置变化时沿用游标
+        fingerprint = self._scan_fingerprint()
+        self._force_full_scan = self.get_data("scan_fingerprint") != fingerprint
+        if self._force_full_scan:
+            self.save_data("scan_cursor", None)
+            self.save_data("scan_fingerprint", fingerprint)
+        
         # 处理立即运行一次的情况
         if self._onlyonce:
             self._run_onlyonce()
@@ -142,6 +274,11 @@ class PTSeeder(_PluginBase):
         # 基础设置
         self._enabled = config.get("enabled", False)
         self._cron = config.get("cron", "*/5 * * * *")
+        self._stable_min_wait = int(config.get("stable_min_wait", 10) or 0)
+        self._stable_max_wait = int(config.get("stable_max_wait", 7200) or 0)
+        self._watch_mode = config.get("watch_mode", "auto") or "auto"
+        self._poll_interval = int(config.get("poll_interval", 10) or 10)
+        self._poll_budget = int(config.get("poll_budget", 100) or 100)
         self._onlyonce = config.get("onlyonce", False)
         self._notify = config.get("notify", True)
         
@@ -151,6 +288,14 @@ class PTSeeder(_PluginBase):
         self._exclude_dirs = config.get("exclude_dirs", "@eaDir,@Recycle,.DS_Store")
         self._include_exts = config.get("include_exts", ".mkv,.mp4,.avi,.rmvb,.mov,.ts,.m2ts")
         self._min_file_size = config.get("min_file_size", 100)
+        self._exclude_patterns = config.get("exclude_patterns", "")
+        self._release_depth = int(config.get("release_depth", 0) or 0)
+        self._update_existing = config.get("update_existing", False)
+        self._scan_index_enabled = config.get("scan_index", True)
+        self._full_rescan = config.get("full_rescan", False)
+        self._scan_threads = int(config.get("scan_threads", 0) or 0)
+        self._scan_budget = int(config.get("scan_budget", 0) or 0)
+        self._scan_budget_calls = int(config.get("scan_budget_calls", 0) or 0)
         
         # 种子设置
         self._trackers = config.get("trackers", "")
@@ -158,12 +303,29 @@ class PTSeeder(_PluginBase):
         self._private_torrent = config.get("private_torrent", True)
         self._source = config.get("source", "")
         self._comment = config.get("comment", "")
+        self._site_profiles = config.get("site_profiles", "")
+        self._profile_add_to_client = config.get("profile_add_to_client", True)
+        self._torrent_version = config.get("torrent_version", "v1")
+        
+        # 性能设置
+        self._hash_workers = int(config.get("hash_workers", 0) or 0)
+        self._hash_mmap = config.get("hash_mmap", False)
+        self._hash_readahead = int(config.get("hash_readahead", 0) or 0)
+        self._hash_drop_cache = config.get("hash_drop_cache", True)
+        self._hash_cache_enabled = config.get("hash_cache", True)
+        self._hash_cache_size = int(config.get("hash_cache_size", 64) or 0)
+        self._hash_backend = config.get("hash_backend", "thread")
+        self._hash_processes = int(config.get("hash_processes", 0) or 0)
+        self._io_concurrency = int(config.get("io_concurrency", 1) or 1)
+        self._queue_workers = int(config.get("queue_workers", 0) or 0)
+        self._queue_limit = int(config.get("queue_limit", 100) or 0)
         
         # 下载器设置
         self._client_type = config.get("client_type", "qbittorrent")
         self._add_to_client = config.get("add_to_client", True)
         self._auto_start = config.get("auto_start", False)
         self._skip_check = config.get("skip_check", True)
+        self._submit_window = float(config.get("submit_window", 2) or 0)
         
         # qBittorrent
         self._qb_url = config.get("qb_url", "http://localhost:8080")
@@ -171,6 +333,8 @@ class PTSeeder(_PluginBase):
         self._qb_password = config.get("qb_password", "adminadmin")
         self._qb_category = config.get("qb_category", "")
         self._qb_save_path = config.get("qb_save_path", "")
+        self._qb_fastresume = config.get("qb_fastresume", False)
+        self._qb_bt_backup = config.get("qb_bt_backup", "")
         
         # Transmission
         self._tr_host = config.get("tr_host", "localhost")
@@ -178,6 +342,8 @@ class PTSeeder(_PluginBase):
         self._tr_username = config.get("tr_username", "")
         self._tr_password = config.get("tr_password", "")
         self._tr_download_dir = config.get("tr_download_dir", "")
+        self._tr_resume = config.get("tr_resume", False)
+        self._tr_resume_dir = config.get("tr_resume_dir", "")
         
         # 高级设置
         self._tags = config.get("tags", "PT,AutoSeed")
@@ -207,6 +373,63 @@ class PTSeeder(_PluginBase):
         if not self._tr_download_dir and self._monitor_dir:
             self._tr_download_dir = self._monitor_dir
 
+    def _scan_fingerprint(self) -> str:
+        """影響掃描與處理結果的設置摘要：監控目錄、過濾規則、發布識別、輸出配置及分片設置"""
+        settings_data = {
+            "monitor_dir": self._monitor_dir,
+            "torrent_save_dir": self._torrent_save_dir,
+            "exclude_dirs": self._exclude_dirs,
+            "include_exts": self._include_exts,
+            "min_file_size": self._min_file_size,
+            "exclude_patterns": self._exclude_patterns,
+            "release_depth": self._release_depth,
+            "update_existing": self._update_existing,
+            "profiles": [[profile.name, profile.trackers, profile.source, profile.comment, profile.private]
+                         for profile in self._profiles],
+            "piece_size": self._piece_size,
+            "torrent_version": self._torrent_version
+        }
+        return hashlib.sha1(json.dumps(settings_data, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _init_runtime(self):
+        """創建設備調度、處理隊列、分片哈希緩存及掃描索引，已創建時直接返回"""
+        if self._work_queue:
+            return
+        self._init_hash_cache()
+        # 按設備調度哈希讀取
+        self._io_scheduler = DeviceScheduler(self._io_concurrency)
+        # 文件監控與定時任務共用的處理隊列
+        self._work_queue = WorkQueue(self._process_directory,
+                                     workers=self._queue_workers or 4,
+                                     limit=self._queue_limit,
+                                     scheduler=self._io_scheduler)
+        self._work_queue.start()
+        self._init_scan_index()
+
+    def _init_hash_cache(self):
+        """初始化分片哈希緩存"""
+        if not self._hash_cache_enabled or self._hash_cache_size <= 0:
+            return
+        try:
+            db_path = os.path.join(str(self.get_data_path()), "hashcache.db")
+            self._hash_cache = PieceHashCache(db_path, self._hash_cache_size * 1024 * 1024)
+            self._hash_cache_path = db_path
+        except Exception as e:
+            logger.error(f"{self.plugin_name} 初始化分片哈希緩存失敗: {e}")
+            self._hash_cache = None
+            self._hash_cache_path = ""
+
+    def _init_scan_index(self):
+        """初始化目錄掃描索引"""
+        if not self._scan_index_enabled:
+            return
+        try:
+            db_path = os.path.join(str(self.get_data_path()), "scanindex.db")
+            self._scan_index = ScanIndex(db_path)
+        except Exception as e:
+            logger.error(f"{self.plugin_name} 初始化掃描索引失敗: {e}")
+            self._scan_index = None
+
     def get_state(self) -> bool:
         """获取插件状态"""
         return self._enabled
@@ -217,6 +440,11 @@ class PTSeeder(_PluginBase):
             # 基础设置
             "enabled": self._enabled,
             "cron": self._cron,
+            "stable_min_wait": self._stable_min_wait,
+            "stable_max_wait": self._stable_max_wait,
+            "watch_mode": self._watch_mode,
+            "poll_interval": self._poll_interval,
+            "poll_budget": self._poll_budget,
             "onlyonce": self._onlyonce,
             "notify": self._notify,
             
@@ -226,6 +454,14 @@ class PTSeeder(_PluginBase):
             "exclude_dirs": self._exclude_dirs,
             "include_exts": self._include_exts,
             "min_file_size": self._min_file_size,
+            "exclude_patterns": self._exclude_patterns,
+            "release_depth": self._release_depth,
+            "update_existing": self._update_existing,
+            "scan_index": self._scan_index_enabled,
+            "full_rescan": self._full_rescan,
+            "scan_threads": self._scan_threads,
+            "scan_budget": self._scan_budget,
+            "scan_budget_calls": self._scan_budget_calls,
             
             # 种子设置
             "trackers": self._trackers,
@@ -233,12 +469,29 @@ class PTSeeder(_PluginBase):
             "private_torrent": self._private_torrent,
             "source": self._source,
             "comment": self._comment,
+            "site_profiles": self._site_profiles,
+            "profile_add_to_client": self._profile_add_to_client,
+            "torrent_version": self._torrent_version,
+            
+            # 性能设置
+            "hash_workers": self._hash_workers,
+            "hash_mmap": self._hash_mmap,
+            "hash_readahead": self._hash_readahead,
+            "hash_drop_cache": self._hash_drop_cache,
+            "hash_cache": self._hash_cache_enabled,
+            "hash_cache_size": self._hash_cache_size,
+            "hash_backend": self._hash_backend,
+            "hash_processes": self._hash_processes,
+            "io_concurrency": self._io_concurrency,
+            "queue_workers": self._queue_workers,
+            "queue_limit": self._queue_limit,
             
             # 下载器设置
             "client_type": self._client_type,
             "add_to_client": self._add_to_client,
             "auto_start": self._auto_start,
             "skip_check": self._skip_check,
+            "submit_window": self._submit_window,
             
             # qBittorrent
             "qb_url": self._qb_url,
@@ -246,6 +499,8 @@ class PTSeeder(_PluginBase):
             "qb_password": self._qb_password,
             "qb_category": self._qb_category,
             "qb_save_path": self._qb_save_path,
+            "qb_fastresume": self._qb_fastresume,
+            "qb_bt_backup": self._qb_bt_backup,
             
             # Transmission
             "tr_host": self._tr_host,
@@ -253,6 +508,8 @@ class PTSeeder(_PluginBase):
             "tr_username": self._tr_username,
             "tr_password": self._tr_password,
             "tr_download_dir": self._tr_download_dir,
+            "tr_resume": self._tr_resume,
+            "tr_resume_dir": self._tr_resume_dir,
             
             # 高级设置
             "tags": self._tags,
@@ -366,14 +623,17 @@ class PTSeeder(_PluginBase):
             return {"code": 1, "message": f"路徑不存在: {path}"}
         
         try:
-            torrent_file = self._create_torrent_for_path(path)
-            if torrent_file:
-                info = self._get_pt_form_info(path) if self._extract_info else {}
+            manifest = ContentManifest.scan(path)
+            torrent_files = self._create_torrents_for_path(path, self._profiles, manifest=manifest)
+            if torrent_files:
+                info = self._get_pt_form_info(path, manifest) if self._extract_info else {}
                 return {
                     "code": 0, 
                     "message": "種子文件已生成", 
                     "data": {
-                        "torrent_file": torrent_file,
+                        "torrent_file": torrent_files[0].torrent_path,
+                        "torrent_files": [result.torrent_path for result in torrent_files],
+                        "info_hash": torrent_files[0].info_hash,
                         "pt_info": info
                     }
                 }
@@ -404,7 +664,13 @@ class PTSeeder(_PluginBase):
                 "monitor_dir": self._monitor_dir,
                 "torrent_save_dir": self._torrent_save_dir,
                 "client_type": self._client_type,
-                "observer_running": self._observer is not None,
+                "qbittorrent": self._qb_session.status() if self._qb_session else {},
+                "observer_running": self._observer is not None or self._poller is not None,
+                "poller": self._poller.stats() if self._poller else {},
+                # 文件監控中仍在等待寫入完成的發布
+                "waiting": self._stability.tracking() if self._stability else [],
+                "queue": self._work_queue.stats() if self._work_queue else {},
+                "submitter": self._submitter.stats() if self._submitter else {},
                 "scheduler_running": self._scheduler and self._scheduler.running
             }
         }
@@ -632,6 +898,95 @@ class PTSeeder(_PluginBase):
                             }
                         ]
                     },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 8},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'exclude_patterns',
+                                            'label': '排除路徑模式',
+                                            'placeholder': '**/Sample/**,*.part,**/Extras/**',
+                                            'hint': 'glob模式，逗號分隔，匹配相對監控目錄的路徑，** 匹配任意層目錄，不區分大小寫',
+                                            'persistent-hint': True,
+                                            'clearable': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'release_depth',
+                                            'label': '發布目錄層級',
+                                            'type': 'number',
+                                            'min': '0',
+                                            'hint': '0為自動識別；如分類目錄/發布目錄結構填2',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'update_existing',
+                                            'label': '增量更新種子',
+                                            'hint': '已有種子的目錄新增文件時，復用未變化部分的分片哈希重新生成',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'scan_index',
+                                            'label': '掃描索引',
+                                            'hint': '記錄目錄狀態，定時掃描跳過未變化的目錄',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'full_rescan',
+                                            'label': '下次完整掃描',
+                                            'hint': '下次任務重新檢查所有目錄並校正索引，執行後自動關閉',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
 
                     # 执行设置
                     {
@@ -659,7 +1014,7 @@ class PTSeeder(_PluginBase):
                         'content': [
                             {
                                 'component': 'VCol',
-                                'props': {'cols': 12},
+                                'props': {'cols': 12, 'md': 4},
                                 'content': [
                                     {
                                         'component': 'VCronField',
@@ -671,6 +1026,101 @@ class PTSeeder(_PluginBase):
                                         }
                                     }
                                 ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'stable_min_wait',
+                                            'label': '靜止等待(秒)',
+                                            'type': 'number',
+                                            'min': '0',
+                                            'hint': '新發布無寫入、大小及修改時間不變持續此時長後開始處理',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'stable_max_wait',
+                                            'label': '最長等待(秒)',
+                                            'type': 'number',
+                                            'min': '0',
+                                            'hint': '持續寫入超過此時長仍未穩定時直接處理',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VSelect',
+                                        'props': {
+                                            'model': 'watch_mode',
+                                            'label': '文件監控方式',
+                                            'items': [
+                                                {'title': '自動', 'value': 'auto'},
+                                                {'title': '系統事件(inotify)', 'value': 'inotify'},
+                                                {'title': '輪詢', 'value': 'polling'}
+                                            ],
+                                            'hint': '自動時NFS/SMB/FUSE掛載使用輪詢，本地磁盤使用系統事件',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'poll_interval',
+                                            'label': '輪詢間隔(秒)',
+                                            'type': 'number',
+                                            'min': '1',
+                                            'placeholder': '10',
+                                            'hint': '輪詢模式下每輪檢查的間隔',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'poll_budget',
+                                            'label': '輪詢CPU預算(毫秒)',
+                                            'type': 'number',
+                                            'min': '1',
+                                            'placeholder': '100',
+                                            'hint': '每輪最多佔用的CPU時間，未檢查完的目錄下輪繼續',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
                             }
                         ]
                     },
@@ -798,8 +1248,72 @@ class PTSeeder(_PluginBase):
                             }
                         ]
                     },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 9},
+                                'content': [
+                                    {
+                                        'component': 'VTextarea',
+                                        'props': {
+                                            'model': 'site_profiles',
+                                            'label': '多站點輸出',
+                                            'placeholder': '站點名稱|Tracker地址(多個用;分隔)|來源標識|種子註釋|私有(1/0)\n'
+                                                           'SiteA|https://tracker.a.com/announce?passkey=xxx|SiteA||1',
+                                            'hint': '每行一個站點，只計算一次分片哈希，為每個站點生成單獨的種子',
+                                            'persistent-hint': True,
+                                            'rows': '3',
+                                            'clearable': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 3},
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'profile_add_to_client',
+                                            'label': '站點種子添加到下載器',
+                                            'hint': '多站點種子同樣添加到下載器做種',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 3},
+                                'content': [
+                                    {
+                                        'component': 'VSelect',
+                                        'props': {
+                                            'model': 'torrent_version',
+                                            'label': '種子格式',
+                                            'items': [
+                                                {'title': 'v1', 'value': 'v1'},
+                                                {'title': 'v2', 'value': 'v2'},
+                                                {'title': 'v1+v2 混合', 'value': 'hybrid'}
+                                            ],
+                                            'hint': 'v2/混合種子按文件並行計算默克爾樹',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
 
-                    # 下载器设置
+                    # 性能设置
                     {
                         'component': 'VRow',
                         'content': [
@@ -813,7 +1327,7 @@ class PTSeeder(_PluginBase):
                                     {
                                         'component': 'VCardSubtitle',
                                         'props': {
-                                            'text': '下載器設置'
+                                            'text': '性能設置'
                                         }
                                     }
                                 ]
@@ -828,15 +1342,14 @@ class PTSeeder(_PluginBase):
                                 'props': {'cols': 12, 'md': 3},
                                 'content': [
                                     {
-                                        'component': 'VSelect',
+                                        'component': 'VTextField',
                                         'props': {
-                                            'model': 'client_type',
-                                            'label': '下載器類型',
-                                            'items': [
-                                                {'title': 'qBittorrent', 'value': 'qbittorrent'},
-                                                {'title': 'Transmission', 'value': 'transmission'}
-                                            ],
-                                            'hint': '選擇要使用的下載器',
+                                            'model': 'hash_workers',
+                                            'label': '哈希線程數',
+                                            'type': 'number',
+                                            'min': '0',
+                                            'placeholder': '0',
+                                            'hint': '並行計算分片哈希的線程數，0表示自動',
                                             'persistent-hint': True
                                         }
                                     }
@@ -849,9 +1362,9 @@ class PTSeeder(_PluginBase):
                                     {
                                         'component': 'VSwitch',
                                         'props': {
-                                            'model': 'add_to_client',
-                                            'label': '添加到下載器',
-                                            'hint': '是否自動添加種子到下載器',
+                                            'model': 'hash_mmap',
+                                            'label': '內存映射讀取',
+                                            'hint': '本地文件直接從映射頁計算哈希，網絡掛載自動回退',
                                             'persistent-hint': True
                                         }
                                     }
@@ -862,11 +1375,14 @@ class PTSeeder(_PluginBase):
                                 'props': {'cols': 12, 'md': 3},
                                 'content': [
                                     {
-                                        'component': 'VSwitch',
+                                        'component': 'VTextField',
                                         'props': {
-                                            'model': 'skip_check',
-                                            'label': '跳過校驗',
-                                            'hint': '添加時跳過文件校驗',
+                                            'model': 'hash_readahead',
+                                            'label': '預讀分片數',
+                                            'type': 'number',
+                                            'min': '0',
+                                            'placeholder': '0',
+                                            'hint': '讀取領先哈希的分片數，0表示自動',
                                             'persistent-hint': True
                                         }
                                     }
@@ -879,9 +1395,316 @@ class PTSeeder(_PluginBase):
                                     {
                                         'component': 'VSwitch',
                                         'props': {
-                                            'model': 'auto_start',
-                                            'label': '自動開始',
-                                            'hint': '添加後自動開始做種',
+                                            'model': 'hash_drop_cache',
+                                            'label': '釋放頁緩存',
+                                            'hint': '讀取後釋放頁緩存，避免擠佔媒體服務緩存',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 3},
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'hash_cache',
+                                            'label': '分片哈希緩存',
+                                            'hint': '緩存文件分片哈希，重新生成種子時無需再讀取數據',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 3},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'hash_cache_size',
+                                            'label': '緩存上限(MB)',
+                                            'type': 'number',
+                                            'min': '0',
+                                            'placeholder': '64',
+                                            'hint': '超出後淘汰最久未使用的記錄',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 3},
+                                'content': [
+                                    {
+                                        'component': 'VSelect',
+                                        'props': {
+                                            'model': 'hash_backend',
+                                            'label': '哈希執行方式',
+                                            'items': [
+                                                {'title': '線程', 'value': 'thread'},
+                                                {'title': '獨立進程', 'value': 'process'}
+                                            ],
+                                            'hint': '獨立進程計算哈希，不佔用MoviePilot主進程',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 3},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'hash_processes',
+                                            'label': '哈希進程數',
+                                            'type': 'number',
+                                            'min': '0',
+                                            'placeholder': '0',
+                                            'hint': '同時計算的種子數，0表示自動',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 3},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'io_concurrency',
+                                            'label': '單設備並發數',
+                                            'type': 'number',
+                                            'min': '1',
+                                            'placeholder': '1',
+                                            'hint': '同一物理磁盤同時哈希的任務數，不同磁盤並行',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 3},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'scan_threads',
+                                            'label': '掃描線程數',
+                                            'type': 'number',
+                                            'min': '0',
+                                            'placeholder': '0',
+                                            'hint': '並發列目錄的線程數，0表示自動（網絡掛載並行，本地順序）',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 3},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'scan_budget',
+                                            'label': '掃描時間預算(秒)',
+                                            'type': 'number',
+                                            'min': '0',
+                                            'placeholder': '0',
+                                            'hint': '超出後記錄進度，下次從中斷處繼續，0表示不限制',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 3},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'scan_budget_calls',
+                                            'label': '掃描stat預算',
+                                            'type': 'number',
+                                            'min': '0',
+                                            'placeholder': '0',
+                                            'hint': '單次掃描的stat/列目錄次數上限，0表示不限制',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 3},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'queue_workers',
+                                            'label': '處理線程數',
+                                            'type': 'number',
+                                            'min': '0',
+                                            'placeholder': '0',
+                                            'hint': '文件監控與定時任務共用的處理線程數，0表示自動(4)',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 3},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'queue_limit',
+                                            'label': '隊列上限',
+                                            'type': 'number',
+                                            'min': '0',
+                                            'placeholder': '100',
+                                            'hint': '待處理發布達到上限時暫停提交，0表示不限制',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+
+                    # 下载器设置
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12},
+                                'content': [
+                                    {
+                                        'component': 'VDivider'
+                                    },
+                                    {
+                                        'component': 'VCardSubtitle',
+                                        'props': {
+                                            'text': '下載器設置'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 3},
+                                'content': [
+                                    {
+                                        'component': 'VSelect',
+                                        'props': {
+                                            'model': 'client_type',
+                                            'label': '下載器類型',
+                                            'items': [
+                                                {'title': 'qBittorrent', 'value': 'qbittorrent'},
+                                                {'title': 'Transmission', 'value': 'transmission'}
+                                            ],
+                                            'hint': '選擇要使用的下載器',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 3},
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'add_to_client',
+                                            'label': '添加到下載器',
+                                            'hint': '是否自動添加種子到下載器',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 3},
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'skip_check',
+                                            'label': '跳過校驗',
+                                            'hint': '添加時跳過文件校驗',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 3},
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'auto_start',
+                                            'label': '自動開始',
+                                            'hint': '添加後自動開始做種',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 3},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'submit_window',
+                                            'label': '提交批處理窗口(秒)',
+                                            'type': 'number',
+                                            'min': '0',
+                                            'placeholder': '2',
+                                            'hint': '窗口內完成的種子合併提交，0表示不等待',
                                             'persistent-hint': True
                                         }
                                     }
@@ -1016,6 +1839,46 @@ class PTSeeder(_PluginBase):
                             }
                         ]
                     },
+                    {
+                        'component': 'VRow',
+                        'props': {
+                            'v-show': "client_type === 'qbittorrent'"
+                        },
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'qb_fastresume',
+                                            'label': '生成快速恢復數據',
+                                            'hint': '在種子旁生成 .fastresume，所有分片標記為已完成',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 8},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'qb_bt_backup',
+                                            'label': 'BT_backup 目錄',
+                                            'placeholder': '留空不導出',
+                                            'hint': '按種子ID寫入種子及快速恢復數據，qBittorrent 下次啟動時導入；開啟添加到下載器時不寫入',
+                                            'persistent-hint': True,
+                                            'clearable': True
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
 
                     # Transmission设置
                     {
@@ -1143,6 +2006,46 @@ class PTSeeder(_PluginBase):
                             }
                         ]
                     },
+                    {
+                        'component': 'VRow',
+                        'props': {
+                            'v-show': "client_type === 'transmission'"
+                        },
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 4},
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'tr_resume',
+                                            'label': '生成恢復數據',
+                                            'hint': '在種子旁生成 .resume，所有分片標記為已校驗',
+                                            'persistent-hint': True
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {'cols': 12, 'md': 8},
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'tr_resume_dir',
+                                            'label': 'resume 目錄',
+                                            'placeholder': '留空不導出',
+                                            'hint': 'Transmission 配置目錄下的 resume 目錄，種子寫入同級 torrents 目錄，下次啟動時導入；開啟添加到下載器時不寫入',
+                                            'persistent-hint': True,
+                                            'clearable': True
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
 
                     # 高级设置
                     {
@@ -1406,6 +2309,11 @@ class PTSeeder(_PluginBase):
             # 返回当前配置值
             "enabled": self._enabled,
             "cron": self._cron,
+            "stable_min_wait": self._stable_min_wait,
+            "stable_max_wait": self._stable_max_wait,
+            "watch_mode": self._watch_mode,
+            "poll_interval": self._poll_interval,
+            "poll_budget": self._poll_budget,
             "onlyonce": self._onlyonce,
             "notify": self._notify,
             
@@ -1414,29 +2322,57 @@ class PTSeeder(_PluginBase):
             "exclude_dirs": self._exclude_dirs,
             "include_exts": self._include_exts,
             "min_file_size": self._min_file_size,
+            "exclude_patterns": self._exclude_patterns,
+            "release_depth": self._release_depth,
+            "update_existing": self._update_existing,
+            "scan_index": self._scan_index_enabled,
+            "full_rescan": self._full_rescan,
+            "scan_threads": self._scan_threads,
+            "scan_budget": self._scan_budget,
+            "scan_budget_calls": self._scan_budget_calls,
             
             "trackers": self._trackers,
             "piece_size": self._piece_size,
             "private_torrent": self._private_torrent,
             "source": self._source,
             "comment": self._comment,
+            "site_profiles": self._site_profiles,
+            "profile_add_to_client": self._profile_add_to_client,
+            "torrent_version": self._torrent_version,
+            
+            "hash_workers": self._hash_workers,
+            "hash_mmap": self._hash_mmap,
+            "hash_readahead": self._hash_readahead,
+            "hash_drop_cache": self._hash_drop_cache,
+            "hash_cache": self._hash_cache_enabled,
+            "hash_cache_size": self._hash_cache_size,
+            "hash_backend": self._hash_backend,
+            "hash_processes": self._hash_processes,
+            "io_concurrency": self._io_concurrency,
+            "queue_workers": self._queue_workers,
+            "queue_limit": self._queue_limit,
             
             "client_type": self._client_type,
             "add_to_client": self._add_to_client,
             "auto_start": self._auto_start,
             "skip_check": self._skip_check,
+            "submit_window": self._submit_window,
             
             "qb_url": self._qb_url,
             "qb_username": self._qb_username,
             "qb_password": self._qb_password,
             "qb_category": self._qb_category,
             "qb_save_path": self._qb_save_path,
+            "qb_fastresume": self._qb_fastresume,
+            "qb_bt_backup": self._qb_bt_backup,
             
             "tr_host": self._tr_host,
             "tr_port": self._tr_port,
             "tr_username": self._tr_username,
             "tr_password": self._tr_password,
             "tr_download_dir": self._tr_download_dir,
+            "tr_resume": self._tr_resume,
+            "tr_resume_dir": self._tr_resume_dir,
             
             "tags": self._tags,
             "upload_limit": self._upload_limit,
@@ -1466,28 +2402,56 @@ class PTSeeder(_PluginBase):
             if not self._validate_config():
                 return
             
+            # 插件停用時手動運行，按需創建處理隊列與索引
+            self._init_runtime()
+            
             # 確保種子保存目錄存在
             os.makedirs(self._torrent_save_dir, exist_ok=True)
             
-            # 掃描目錄
-            processed_count = 0
-            error_count = 0
-            
-            for root, dirs, files in os.walk(self._monitor_dir):
-                # 跳過排除目錄
-                dirs[:] = [d for d in dirs if not self._should_exclude_dir(d)]
-                
-                # 跳過種子保存目錄
-                if root == self._torrent_save_dir:
-                    continue
-                
-                # 檢查是否有符合條件的文件
-                if self._has_valid_files(root, files):
-                    result = self._process_directory(root)
-                    if result:
-                        processed_count += 1
-                    else:
-                        error_count += 1
+            # 掃描目錄，上次掃描因預算中斷時從游標處繼續
+            cursor = self.get_data("scan_cursor") or {}
+            if cursor.get("monitor_dir") != self._monitor_dir:
+                cursor = {}
+            full = cursor.get("full", False) or self._full_rescan or self._force_full_scan or not self._scan_index
+            tasks, records, owners, removed, next_cursor = self._scan_monitor_dir(full, cursor.get("path", ""))
+            self.save_data("scan_cursor", {
+                "monitor_dir": self._monitor_dir,
+                "path": next_cursor,
+                "full": full
+            } if next_cursor else None)
+            
+            # 文件監控仍在等待寫入完成的發布留待就緒後處理，其目錄保持待處理
+            if self._stability:
+                waiting = [path for path, _ in tasks if self._stability.is_tracking(path)]
+                if waiting:
+                    logger.info(f"{self.plugin_name} {len(waiting)} 個發布仍在寫入，本次跳過")
+                    tasks = [task for task in tasks if task[0] not in waiting]
+            
+            # 提交到處理隊列，與文件監控共用工作線程並按路徑去重；同一磁盤順序讀取，不同磁盤並行
+            # 設備按掃描已列出的文件解析，不再為此單獨遍歷發布；未列出的設備由哈希任務按需佔用
+            futures = [self._work_queue.submit(path, files, source="scan") for path, files in tasks]
+            results = [self._future_result(future) for future in futures]
+            processed_count = sum(1 for result in results if result)
+            error_count = len(results) - processed_count
+            
+            # 更新掃描索引，所屬發布全部成功的目錄標記完成，否則保持待處理，下次掃描重試
+            if self._scan_index:
+                # 本次生成了默認種子的發布直接記錄隊列返回的info-hash，無需重新讀取種子文件
+                succeeded = {path: result for (path, _), result in zip(tasks, results) if result}
+                for path, units in owners.items():
+                    if all(unit in succeeded for unit in units):
+                        record = records[path]
+                        info_hash = succeeded.get(path)
+                        records[path] = record._replace(state=STATE_DONE,
+                                                        info_hash=info_hash if isinstance(info_hash, str)
+                                                        else record.info_hash)
+                self._scan_index.sync(records.values(), removed)
+            # 完整掃描需完成一整輪後才算結束
+            if full and not next_cursor:
+                self._force_full_scan = False
+                if self._full_rescan:
+                    self._full_rescan = False
+                    self._update_config()
             
             # 發送任務完成通知
             if processed_count > 0 or error_count > 0:
@@ -1506,6 +2470,226 @@ class PTSeeder(_PluginBase):
             self._running = False
             self._lock.release()
 
+    @staticmethod
+    def _future_result(future: Future) -> Union[str, bool]:
+        """等待隊列任務完成，返回處理結果，取消或異常時視為失敗"""
+        try:
+            return future.result()
+        except Exception:
+            return False
+
+    def _scan_monitor_dir(self, full: bool, cursor: str = "") -> Tuple[List[Tuple[str, List[str]]], Dict[str, DirRecord],
+                                                                         Dict[str, List[str]], List[str], str]:
+        """
+        掃描監控目錄，返回待處理發布(路徑, 有效文件路徑列表)、需寫入索引的記錄、待處理目錄所屬的發布、已不存在的目錄及新游標
+        有變化的目錄歸併到所屬發布，每個發布只處理一次，不再為發布的子目錄或上層目錄重複生成種子；
+        非完整掃描時，mtime未變化且已完成或無內容的目錄不再列出文件，直接沿用索引中的子目錄；
+        多線程掃描時各子樹並發列目錄，結果按與 os.walk 一致的順序整理，與單線程掃描相同；
+        cursor 為上次中斷時最後處理的目錄，按該順序跳過其之前的目錄；預算用盡時返回新游標，掃描完一輪時為空
+        """
+        index = self._scan_index.load() if self._scan_index else {}
+        threads = self._get_scan_threads()
+        cursor_key = self._scan_key(cursor) if cursor else None
+        deadline = time.time() + self._scan_budget if self._scan_budget > 0 else 0
+        calls = 0
+        # 預算用盡前至少處理一個游標之後的目錄，保證每輪都有進展
+        progressed = False
+        
+        def position(path: str) -> str:
+            """目錄相對游標的位置：before 整個子樹已處理，ancestor 為游標所在路徑，after 待處理"""
+            if cursor_key is None:
+                return "after"
+            key = self._scan_key(path)
+            if cursor_key[:len(key)] == key:
+                return "ancestor"
+            return "before" if key < cursor_key else "after"
+        
+        def exhausted() -> bool:
+            if not progressed:
+                return False
+            if deadline and time.time() >= deadline:
+                return True
+            return 0 < self._scan_budget_calls <= calls
+        
+        # 路徑 -> 掃描結果；目錄不存在時不記錄，因預算未掃描的目錄記入 unscanned
+        results: Dict[str, DirScan] = {}
+        unscanned = set()
+        if threads <= 1:
+            stack = [self._monitor_dir]
+            while stack:
+                path = stack.pop()
+                where = position(path)
+                if where == "before":
+                    continue
+                if exhausted():
+                    unscanned.add(path)
+                    unscanned.update(stack)
+                    break
+                result = self._scan_directory(path, index.get(path), full)
+                if not result:
+                    continue
+                results[path] = result
+                calls += result.calls
+                progressed = progressed or where == "after"
+                stack.extend(os.path.join(path, name) for name in reversed(result.children))
+        else:
+            # 待提交目錄按掃描順序優先出隊，在途任務數有限，預算用盡時超出量可控；
+            # 並發完成的順序不定，只有按掃描順序連續完成的部分才算進展
+            gone = set()
+            prefix = [self._monitor_dir]
+            
+            def advance():
+                nonlocal progressed
+                while prefix:
+                    path = prefix[-1]
+                    if position(path) == "before" or path in gone:
+                        prefix.pop()
+                        continue
+                    result = results.get(path)
+                    if not result:
+                        return
+                    prefix.pop()
+                    progressed = progressed or position(path) == "after"
+                    prefix.extend(os.path.join(path, name) for name in reversed(result.children))
+            
+            with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="ptseeder-scan") as pool:
+                pending = {}
+                queue = [(self._scan_key(self._monitor_dir), self._monitor_dir)]
+                while queue or pending:
+                    while queue and len(pending) < threads * 2:
+                        _, path = heapq.heappop(queue)
+                        if position(path) == "before":
+                            continue
+                        if exhausted():
+                            unscanned.update(item[1] for item in queue)
+                            unscanned.add(path)
+                            queue.clear()
+                            break
+                        pending[pool.submit(self._scan_directory, path, index.get(path), full)] = path
+                    if not pending:
+                        continue
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        path = pending.pop(future)
+                        result = future.result()
+                        if not result:
+                            gone.add(path)
+                            continue
+                        results[path] = result
+                        calls += result.calls
+                        advance()
+                        for name in result.children:
+                            child = os.path.join(path, name)
+                            if exhausted():
+                                unscanned.add(child)
+                            else:
+                                heapq.heappush(queue, (self._scan_key(child), child))
+        
+        # 深度優先，子目錄按名稱排序，順序與 os.walk 一致，同時識別發布；
+        # 遇到發布之外未掃描的目錄即停止，其後的結果下次重新掃描；發布內因預算未掃描的子目錄在此補掃，保證發布完整
+        units: Dict[str, List[str]] = {}  # 發布路徑 -> 有效文件
+        owners: Dict[str, List[str]] = {}  # 待處理目錄 -> 所屬發布
+        records: Dict[str, DirRecord] = {}
+        last = ""
+        complete = True
+        scanned = 0
+        stack: List[Tuple[str, Optional[str]]] = [(self._monitor_dir, None)]
+        while stack:
+            path, unit = stack.pop()
+            if path in unscanned:
+                if not unit:
+                    complete = False
+                    break
+                result = self._scan_directory(path, index.get(path), full)
+                if result:
+                    results[path] = result
+                    calls += result.calls
+                    unscanned.update(os.path.join(path, name) for name in result.children)
+            result = results.get(path)
+            if not result:
+                continue
+            # 未變化的目錄沿用索引狀態（只有已完成或無候選文件兩種），重新掃描的目錄按有效文件判斷
+            has_files = bool(result.files) if result.record else index[path].state != STATE_EMPTY
+            if not unit and self._release_detector.is_release(len(self._scan_key(path)), has_files, result.children):
+                unit = path
+            if position(path) == "after":
+                scanned += 1
+                if result.record:
+                    records[path] = result.record
+                if result.files is not None:
+                    # 發布之外目錄中的視頻文件各自作為單文件發布
+                    owners[path] = [unit] if unit else self._release_detector.loose_files(result.files)
+                    for owner in owners[path]:
+                        units.setdefault(owner, []).extend(result.files if unit else [owner])
+                last = path
+            stack.extend((os.path.join(path, name), unit) for name in reversed(result.children))
+        tasks = list(units.items())
+        
+        # 只清理本次掃描範圍內已不存在的目錄
+        next_cursor = "" if complete else (last or cursor)
+        end_key = self._scan_key(next_cursor) if next_cursor else None
+        removed = [path for path in index if path not in results
+                   and (cursor_key is None or self._scan_key(path) > cursor_key)
+                   and (end_key is None or self._scan_key(path) <= end_key)]
+        
+        logger.info(f"{self.plugin_name} {'完整' if full else '增量'}掃描{'完成' if complete else '達到預算，暫停'}："
+                    f"目錄 {scanned} 個，跳過未變化 {scanned - len(records)} 個，待處理發布 {len(tasks)} 個，"
+                    f"掃描線程 {threads}" + (f"，下次從 {next_cursor} 之後繼續" if next_cursor else ""))
+        return tasks, records, owners, removed, next_cursor
+
+    def _scan_key(self, path: str) -> Tuple[str, ...]:
+        """目錄相對監控目錄的路徑組件，元組順序即深度優先、按名稱排序的掃描順序"""
+        rel = os.path.relpath(path, self._monitor_dir)
+        return () if rel == "." else tuple(rel.split(os.sep))
+
+    def _get_scan_threads(self) -> int:
+        """掃描線程數，自動時網絡/FUSE掛載並行掃描，本地磁盤順序掃描"""
+        if self._scan_threads > 0:
+            return self._scan_threads
+        return 8 if MountTable().is_network(self._monitor_dir) else 1
+
+    def _scan_directory(self, path: str, record: Optional[DirRecord], full: bool) -> Optional[DirScan]:
+        """掃描單個目錄，未變化時沿用索引中的子目錄，目錄不存在時返回None"""
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        
+        rel_dir = "/".join(self._scan_key(path))
+        if not full and record and record.unchanged(mtime_ns):
+            return DirScan(None, None, [name for name in record.children
+                                        if not self._should_exclude_dir(name, rel_dir)], 1)
+        
+        try:
+            with os.scandir(path) as it:
+                items = sorted(it, key=lambda item: item.name)
+        except OSError as e:
+            logger.warning(f"{self.plugin_name} 讀取目錄 {path} 失敗: {e}")
+            return None
+        
+        files = []
+        children = []
+        for item in items:
+            try:
+                if not item.is_dir():
+                    files.append(item)
+                elif not item.is_symlink() and not self._should_exclude_dir(item.name, rel_dir):
+                    children.append(item.name)
+            except OSError:
+                continue
+        
+        # 跳過種子保存目錄
+        valid, size, stats = ([], 0, 0) if path == self._torrent_save_dir \
+            else self._scan_valid_files(files, rel_dir)
+        # 候選文件未達最小大小時可能仍在複製，原地增長不改變目錄mtime，保持待處理以便下次重新檢查
+        record = DirRecord(path=path,
+                           mtime_ns=mtime_ns,
+                           size=size,
+                           state=STATE_PENDING if valid or stats else STATE_EMPTY,
+                           info_hash=record.info_hash if record else "",
+                           children=children)
+        return DirScan(record, valid or None, children, 2 + stats)
+
     def _validate_config(self) -> bool:
         """驗證配置"""
         if not self._monitor_dir or not os.path.isdir(self._monitor_dir):
@@ -1520,88 +2704,154 @@ class PTSeeder(_PluginBase):
         
         return True
 
-    def _should_exclude_dir(self, dirname: str) -> bool:
-        """檢查是否應該排除目錄"""
-        exclude_list = [d.strip() for d in self._exclude_dirs.split(',') if d.strip()]
-        return dirname in exclude_list
+    def _should_exclude_dir(self, dirname: str, parent: str = "") -> bool:
+        """檢查是否應該排除目錄，parent 為所在目錄相對監控目錄的路徑"""
+        return self._scan_filter.exclude_dir(dirname, parent)
 
-    def _has_valid_files(self, root: str, files: List[str]) -> bool:
-        """檢查目錄是否有有效文件"""
-        if not files:
-            return False
-        
-        include_exts = [ext.strip().lower() for ext in self._include_exts.split(',') if ext.strip()]
-        min_size_bytes = self._min_file_size * 1024 * 1024  # MB to bytes
-        
-        for file in files:
-            # 跳過種子文件
-            if file.endswith('.torrent'):
+    def _scan_valid_files(self, files: List[os.DirEntry], rel_dir: str = "") -> Tuple[List[str], int, int]:
+        """返回目錄項中的有效文件路徑、符合條件文件的總大小及stat次數"""
+        scan_filter = self._scan_filter
+        valid = []
+        total_size = 0
+        stats = 0
+        for item in files:
+            if not scan_filter.candidate_file(item.name, rel_dir):
                 continue
-            
-            file_path = os.path.join(root, file)
-            
-            # 檢查擴展名
-            if include_exts:
-                file_ext = os.path.splitext(file)[1].lower()
-                if file_ext not in include_exts:
-                    continue
-            
-            # 檢查文件大小
+            stats += 1
             try:
-                if os.path.getsize(file_path) >= min_size_bytes:
-                    return True
+                file_size = item.stat().st_size
             except OSError:
                 continue
-        
-        return False
+            total_size += file_size
+            if scan_filter.valid_size(file_size):
+                valid.append(item.path)
+        return valid, total_size, stats
+
+    def _is_release(self, path: str) -> bool:
+        """按發布識別規則判斷目錄或文件本身是否為發布"""
+        if not os.path.isdir(path):
+            return self._is_release_file(path)
+        try:
+            with os.scandir(path) as it:
+                items = list(it)
+        except OSError:
+            return False
+        rel_dir = "/".join(self._scan_key(path))
+        files = []
+        children = []
+        for item in items:
+            try:
+                if not item.is_dir():
+                    files.append(item)
+                elif not item.is_symlink() and not self._should_exclude_dir(item.name, rel_dir):
+                    children.append(item.name)
+            except OSError:
+                continue
+        valid, _, _ = self._scan_valid_files(files, rel_dir)
+        if not self._release_detector.is_release(len(self._scan_key(path)), bool(valid), children):
+            return False
+        if valid:
+            return True
+        # 僅因子目錄結構或層級判定為發布時，子目錄中需有有效文件
+        return any(self._scan_filter.valid_size(entry.size)
+                   and self._scan_filter.candidate_file(entry.parts[-1], "/".join((rel_dir,) + entry.parts[:-1]))
+                   for entry in ContentManifest.scan(path).entries)
+
+    def _release_above(self, path: str) -> Optional[str]:
+        """
+        路徑所屬的發布目錄：自監控目錄向下，第一個按發布識別規則判定為發布的上層目錄，與掃描的歸屬一致；
+        文件可能仍在寫入，按候選文件判斷而不要求達到最小大小；上層目錄均不是發布或已排除時返回None
+        """
+        key = self._scan_key(path)
+        if not key or key[0] == os.pardir:
+            return None
+        for depth in range(1, len(key)):
+            if self._should_exclude_dir(key[depth - 1], "/".join(key[:depth - 1])):
+                return None
+            directory = os.path.join(self._monitor_dir, *key[:depth])
+            if self._release_depth:
+                if depth == self._release_depth:
+                    return directory
+                continue
+            rel_dir = "/".join(key[:depth])
+            has_files = False
+            children = []
+            try:
+                with os.scandir(directory) as it:
+                    for item in it:
+                        try:
+                            if not item.is_dir():
+                                has_files = has_files or self._scan_filter.candidate_file(item.name, rel_dir)
+                            elif not item.is_symlink() and not self._should_exclude_dir(item.name, rel_dir):
+                                children.append(item.name)
+                        except OSError:
+                            continue
+            except OSError:
+                return None
+            if self._release_detector.is_release(depth, has_files, children):
+                return directory
+        return None
+
+    def _is_release_file(self, path: str, check_size: bool = True) -> bool:
+        """文件是否為單文件發布：位於發布層級之上的目錄中，且為符合條件的視頻文件"""
+        key = self._scan_key(path)
+        if not key or key[0] == os.pardir or len(key) > (self._release_depth or 1):
+            return False
+        if not self._is_candidate_path(path) or not self._release_detector.loose_files([path]):
+            return False
+        if not check_size:
+            return True
+        try:
+            return self._scan_filter.valid_size(os.path.getsize(path))
+        except OSError:
+            return False
+
+    def _is_candidate_path(self, path: str) -> bool:
+        """文件所在的各級目錄均未排除，且文件本身符合過濾條件"""
+        key = self._scan_key(path)
+        if not key or key[0] == os.pardir:
+            return False
+        for depth, name in enumerate(key[:-1]):
+            if self._should_exclude_dir(name, "/".join(key[:depth])):
+                return False
+        return self._scan_filter.candidate_file(key[-1], "/".join(key[:-1]))
 
-    def _process_directory(self, directory_path: str) -> bool:
-        """處理單個目錄"""
+    def _process_directory(self, directory_path: str) -> Union[str, bool]:
+        """處理單個發布（目錄或單個文件），生成了默認種子時返回其info-hash，已有種子無需處理時返回True，失敗返回False"""
         try:
             dir_name = os.path.basename(directory_path)
-            torrent_name = f"{dir_name}.torrent"
-            torrent_path = os.path.join(self._torrent_save_dir, torrent_name)
             
-            # 檢查是否已有種子文件
-            if os.path.exists(torrent_path):
+            # 檢查是否已有種子文件，僅為缺少種子的配置生成
+            profiles = [profile for profile in self._profiles
+                        if not os.path.exists(os.path.join(self._torrent_save_dir, profile.torrent_name(dir_name)))]
+            if not profiles:
+                if self._update_existing and os.path.isdir(directory_path):
+                    return self._update_directory(directory_path, ContentManifest.scan(directory_path))
                 logger.debug(f"{self.plugin_name} 目錄 {dir_name} 已有對應種子文件，跳過")
                 if self._notify_on_duplicate:
                     self._send_notification(f"目錄 {dir_name} 已有種子文件", NotificationType.Info)
                 return True
             
+            # 掃描一次文件清單，種子生成與發布信息共用
+            manifest = ContentManifest.scan(directory_path)
+            
             # 創建種子文件
-            torrent_file = self._create_torrent_for_path(directory_path)
-            if not torrent_file:
+            torrent_files = self._create_torrents_for_path(directory_path, profiles, manifest=manifest)
+            if not torrent_files:
                 logger.error(f"{self.plugin_name} 為 {dir_name} 創建種子文件失敗")
                 return False
             
-            logger.info(f"{self.plugin_name} 成功為 {dir_name} 創建種子文件: {torrent_file}")
-            
-            # 發送成功通知
-            if self._notify_on_success:
-                self._send_notification(f"成功創建種子文件: {os.path.basename(torrent_file)}", NotificationType.Success)
-            
-            # 添加到下載器
-            if self._add_to_client:
-                success = False
-                if self._client_type == "qbittorrent":
-                    success = self._add_to_qbittorrent(torrent_file, directory_path)
-                elif self._client_type == "transmission":
-                    success = self._add_to_transmission(torrent_file, directory_path)
-                
-                if success:
-                    logger.info(f"{self.plugin_name} 成功添加種子到 {self._client_type}: {os.path.basename(torrent_file)}")
-                else:
-                    logger.warning(f"{self.plugin_name} 添加種子到 {self._client_type} 失敗: {os.path.basename(torrent_file)}")
+            self._handle_created_torrents(directory_path, torrent_files)
+            info_hash = self._default_info_hash(torrent_files)
             
             # 提取PT信息
             if self._extract_info:
-                pt_info = self._get_pt_form_info(directory_path)
+                pt_info = self._get_pt_form_info(directory_path, manifest)
                 if pt_info and self._notify_on_success:
                     info_text = "\n".join([f"{k}: {v}" for k, v in pt_info.items() if v])
                     self._send_notification(f"PT發布信息:\n{info_text}", NotificationType.Info)
             
-            return True
+            return info_hash
             
         except Exception as e:
             logger.error(f"{self.plugin_name} 處理目錄 {directory_path} 時出錯: {str(e)}")
@@ -1609,61 +2859,387 @@ class PTSeeder(_PluginBase):
                 self._send_notification(f"處理目錄失敗: {os.path.basename(directory_path)} - {str(e)}", NotificationType.Error)
             return False
 
-    def _create_torrent_for_path(self, path: str) -> Optional[str]:
-        """為指定路徑創建種子文件"""
+    def _handle_created_torrents(self, content_path: str, torrent_files: List[TorrentResult]):
+        """種子生成後的通知及添加到下載器"""
+        name = os.path.basename(content_path)
+        for result in torrent_files:
+            profile, torrent_file = result.profile, result.torrent_path
+            logger.info(f"{self.plugin_name} 成功為 {name} 創建種子文件: {torrent_file}")
+            
+            # 發送成功通知
+            if self._notify_on_success:
+                self._send_notification(f"成功創建種子文件: {os.path.basename(torrent_file)}", NotificationType.Success)
+            
+            # 快速恢復數據；已通過API添加到下載器時不再寫入BT_backup，避免同一種子導入兩次
+            if self._qb_fastresume or self._qb_bt_backup:
+                self._export_fastresume(result, bt_backup=not self._add_to_client
+                                        and (not profile.name or self._profile_add_to_client))
+            if self._tr_resume or self._tr_resume_dir:
+                self._export_transmission_resume(result, inject=not self._add_to_client
+                                                 and (not profile.name or self._profile_add_to_client))
+            
+            # 添加到下載器，由提交線程與同一窗口內的其他種子合併提交
+            if self._add_to_client and (not profile.name or self._profile_add_to_client):
+                item = SubmitItem(torrent_file=torrent_file,
+                                  content_path=content_path,
+                                  info_hash=result.info_hash,
+                                  data=result.data)
+                if self._submitter:
+                    future = self._submitter.submit(item)
+                    future.add_done_callback(lambda f, file=torrent_file: self._on_submitted(file, f.result()))
+                else:
+                    self._on_submitted(torrent_file, self._submit_batch([item])[0])
+
+    def _export_fastresume(self, result: TorrentResult, bt_backup: bool = True):
+        """
+        寫入qBittorrent快速恢復數據，分片剛計算完成，全部標記為已擁有，客戶端添加後無需重新校驗
+        設置了BT_backup目錄時，按種子ID同時寫入 .torrent 與 .fastresume，bt_backup 為 False 時跳過
+        """
+        try:
+            tags = [tag.strip() for tag in self._tags.split(",") if tag.strip()] if self._tags else []
+            data = qbittorrent_fastresume(result.info, result.info_hash, result.info_hash_v2,
+                                          save_path=self._qb_save_path or os.path.dirname(result.content_path),
+                                          trackers=result.profile.trackers,
+                                          category=self._qb_category,
+                                          tags=tags,
+                                          paused=not self._auto_start,
+                                          upload_limit=self._upload_limit * 1024,
+                                          download_limit=self._download_limit * 1024,
+                                          ratio_limit=float(self._ratio_limit or 0),
+                                          seeding_time_limit=int(self._seed_time_limit or 0) * 60)
+            outputs = []
+            if self._qb_fastresume:
+                outputs.append((os.path.splitext(result.torrent_path)[0] + ".fastresume", data))
+            if self._qb_bt_backup and bt_backup:
+                os.makedirs(self._qb_bt_backup, exist_ok=True)
+                outputs.append((os.path.join(self._qb_bt_backup, f"{result.info_hash}.torrent"), result.data))
+                outputs.append((os.path.join(self._qb_bt_backup, f"{result.info_hash}.fastresume"), data))
+            self._write_files(outputs)
+            logger.debug(f"{self.plugin_name} 已寫入快速恢復數據: {os.path.basename(result.torrent_path)}")
+        except Exception as e:
+            logger.error(f"{self.plugin_name} 寫入快速恢復數據 {os.path.basename(result.torrent_path)} 時出錯: {str(e)}")
+
+    def _export_transmission_resume(self, result: TorrentResult, inject: bool = True):
+        """
+        寫入Transmission恢復數據，全部分片標記為已校驗，導入後無需重新讀取數據
+        設置了resume目錄時，同時將種子寫入同級 torrents 目錄，inject 為 False 時跳過
+        """
+        if b'pieces' not in result.info:
+            logger.warning(f"{self.plugin_name} Transmission 不支持純v2種子，跳過生成恢復數據: "
+                           f"{os.path.basename(result.torrent_path)}")
+            return
+        try:
+            tags = [tag.strip() for tag in self._tags.split(",") if tag.strip()] if self._tags else []
+            data = transmission_resume(result.info, result.manifest,
+                                       destination=self._tr_download_dir or os.path.dirname(result.content_path),
+                                       paused=not self._auto_start,
+                                       upload_limit=self._upload_limit * 1024,
+                                       download_limit=self._download_limit * 1024,
+                                       ratio_limit=float(self._ratio_limit or 0),
+                                       labels=tags)
+            outputs = []
+            if self._tr_resume:
+                outputs.append((os.path.splitext(result.torrent_path)[0] + ".resume", data))
+            if self._tr_resume_dir and inject:
+                torrents_dir = os.path.join(os.path.dirname(os.path.normpath(self._tr_resume_dir)), "torrents")
+                os.makedirs(self._tr_resume_dir, exist_ok=True)
+                os.makedirs(torrents_dir, exist_ok=True)
+                stem = self._tr_resume_stem(result)
+                outputs.append((os.path.join(torrents_dir, f"{stem}.torrent"), result.data))
+                outputs.append((os.path.join(self._tr_resume_dir, f"{stem}.resume"), data))
+            self._write_files(outputs)
+            logger.debug(f"{self.plugin_name} 已寫入Transmission恢復數據: {os.path.basename(result.torrent_path)}")
+        except Exception as e:
+            logger.error(f"{self.plugin_name} 寫入Transmission恢復數據 {os.path.basename(result.torrent_path)} 時出錯: {str(e)}")
+
+    def _tr_resume_stem(self, result: TorrentResult) -> str:
+        """Transmission 4.x 以info-hash命名種子及恢復數據，3.x及更早為 <名稱>.<info-hash前16位>，按目錄中已有文件判斷"""
+        try:
+            names = os.listdir(self._tr_resume_dir)
+        except OSError:
+            names = []
+        if any(re.search(r"\.[0-9a-f]{16}\.resume$", name) for name in names):
+            return f"{result.info[b'name'].decode('utf-8')}.{result.info_hash[:16]}"
+        return result.info_hash
+
+    @staticmethod
+    def _write_files(outputs: List[Tuple[str, bytes]]):
+        """逐個寫入文件，先寫臨時文件再替換"""
+        for path, content in outputs:
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(content)
+            os.replace(temp_path, path)
+
+    def _on_submitted(self, torrent_file: str, success: bool):
+        """記錄單個種子的提交結果"""
+        if success:
+            logger.info(f"{self.plugin_name} 成功添加種子到 {self._client_type}: {os.path.basename(torrent_file)}")
+        else:
+            logger.warning(f"{self.plugin_name} 添加種子到 {self._client_type} 失敗: {os.path.basename(torrent_file)}")
+            if self._notify_on_error:
+                self._send_notification(f"添加種子到下載器失敗: {os.path.basename(torrent_file)}", NotificationType.Error)
+
+    @staticmethod
+    def _default_info_hash(torrent_files: List[TorrentResult]) -> Union[str, bool]:
+        """默認配置種子的info-hash，本次未生成默認種子時返回True"""
+        return next((result.info_hash for result in torrent_files if not result.profile.name), "") or True
+
+    def _update_directory(self, directory_path: str, manifest: ContentManifest) -> Union[str, bool]:
+        """目錄文件變化時增量更新種子：復用未變化的前導文件的分片哈希"""
+        dir_name = os.path.basename(directory_path)
+        torrent_path = os.path.join(self._torrent_save_dir, self._profiles[0].torrent_name(dir_name))
+        try:
+            with open(torrent_path, "rb") as f:
+                previous = bencodepy.decode(f.read())[b'info']
+            torrent_mtime_ns = os.stat(torrent_path).st_mtime_ns
+        except Exception as e:
+            logger.warning(f"{self.plugin_name} 讀取已有種子 {torrent_path} 失敗，跳過增量更新: {e}")
+            return True
+        
+        old_files = self._torrent_file_entries(previous)
+        if old_files is None:
+            return True
+        
+        piece_length = self._calculate_piece_size(manifest)
+        version = self._get_torrent_version(piece_length)
+        files, file_list = self._collect_files(manifest, sort_paths=version != "v1")
+        entries = manifest.by_path()
+        
+        # 路徑、大小一致且種子生成後未被修改的前導文件視為未變化
+        unchanged = 0
+        unchanged_bytes = 0
+        for (old_path, old_length), new, (file_path, file_size) in zip(old_files, files, file_list):
+            if old_path != new["path"] or old_length != new["length"]:
+                break
+            if entries[file_path].mtime_ns > torrent_mtime_ns:
+                break
+            unchanged += 1
+            unchanged_bytes += file_size
+        
+        if unchanged == len(old_files) == len(files):
+            logger.debug(f"{self.plugin_name} 目錄 {dir_name} 文件未變化，跳過")
+            return True
+        
+        # 分片大小一致時才能復用，僅復用完整落在未變化文件內的分片；
+        # v2按文件計算，未變化的文件由默克爾樹緩存復用
+        reuse_pieces = 0
+        if version == "v1" and b'file tree' not in previous and previous.get(b'piece length') == piece_length:
+            reuse_pieces = min(unchanged_bytes // piece_length, len(previous.get(b'pieces', b'')) // 20)
+        logger.info(f"{self.plugin_name} 檢測到目錄 {dir_name} 文件變化，增量更新種子："
+                    f"未變化文件 {unchanged} 個，復用分片 {reuse_pieces} 個")
+        
+        torrent_files = self._create_torrents_for_path(
+            directory_path, self._profiles,
+            reuse=previous[b'pieces'][:reuse_pieces * 20] if reuse_pieces else b"",
+            manifest=manifest
+        )
+        if not torrent_files:
+            logger.error(f"{self.plugin_name} 為 {dir_name} 增量更新種子文件失敗")
+            return False
+        self._handle_created_torrents(directory_path, torrent_files)
+        return self._default_info_hash(torrent_files)
+
+    @staticmethod
+    def _torrent_file_entries(info: dict) -> Optional[List[Tuple[list, int]]]:
+        """種子中的文件列表(路徑, 大小)，忽略填充文件；單文件種子返回None"""
+        if b'files' in info:
+            return [(item[b'path'], item[b'length']) for item in info[b'files']
+                    if b'p' not in item.get(b'attr', b'')]
+        if b'file tree' in info:
+            tree = info[b'file tree'].get(info.get(b'name'), {})
+            if b'' in tree:
+                return None
+            entries = []
+            
+            def walk(node: dict, parts: list):
+                for name in sorted(node):
+                    if name == b'':
+                        entries.append((parts, node[name].get(b'length', 0)))
+                    else:
+                        walk(node[name], parts + [name])
+            
+            walk(info[b'file tree'], [])
+            return entries
+        return None
+
+    def _parse_profiles(self) -> List[TorrentProfile]:
+        """解析種子輸出配置：默認配置及多站點配置"""
+        profiles = [TorrentProfile(
+            name="",
+            trackers=[t.strip() for t in self._trackers.strip().split('\n') if t.strip()] if self._trackers else [],
+            source=self._source,
+            comment=self._comment,
+            private=self._private_torrent
+        )]
+        names = {""}
+        for line in (self._site_profiles or "").strip().split('\n'):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = [p.strip() for p in line.split('|')]
+            name = re.sub(r'[\\/:*?"<>|]', '_', parts[0])
+            if not name or name in names:
+                logger.warning(f"{self.plugin_name} 多站點配置名稱無效或重複，已忽略: {line}")
+                continue
+            names.add(name)
+            private = parts[4] not in ("0", "false", "False") if len(parts) > 4 and parts[4] else self._private_torrent
+            profiles.append(TorrentProfile(
+                name=name,
+                trackers=[t.strip() for t in parts[1].split(';') if t.strip()] if len(parts) > 1 else [],
+                source=parts[2] if len(parts) > 2 else "",
+                comment=parts[3] if len(parts) > 3 else "",
+                private=private
+            ))
+        return profiles
+
+    def _create_torrents_for_path(self, path: str, profiles: List[TorrentProfile], reuse: bytes = b"",
+                                  manifest: Optional[ContentManifest] = None) -> List[TorrentResult]:
+        """
+        為指定路徑按各輸出配置創建種子文件，分片哈希只計算一次
+        reuse 為可直接復用的前導分片哈希，從其後的分片開始計算
+        manifest 為已掃描的文件清單，未提供時在此掃描
+        """
         try:
             # 確保目錄存在
             if not os.path.exists(path):
                 logger.error(f"{self.plugin_name} 路徑不存在: {path}")
-                return None
+                return []
+            
+            if manifest is None:
+                manifest = ContentManifest.scan(path)
             
             # 創建info字典
             info = {}
             info["name"] = os.path.basename(path).encode('utf-8')
             
             # 計算分片長度
-            piece_length = self._calculate_piece_size(path)
+            piece_length = self._calculate_piece_size(manifest)
             info["piece length"] = piece_length
             
-            # 添加私有種子標識
-            if self._private_torrent:
-                info["private"] = 1
-            
-            # 添加來源標識
-            if self._source:
-                info["source"] = self._source.encode('utf-8')
-            
-            pieces = bytearray()
+            version = self._get_torrent_version(piece_length)
             
-            if os.path.isdir(path):
+            if manifest.is_dir:
                 # 目錄模式
-                info["files"] = []
-                file_list = []
-                
-                for root, dirs, files in os.walk(path):
-                    dirs.sort()  # 確保目錄按字母排序
-                    files.sort()  # 確保文件按字母排序
-                    
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        rel_path = os.path.relpath(file_path, path)
-                        file_size = os.path.getsize(file_path)
-                        
-                        file_info = {
-                            "length": file_size,
-                            "path": [p.encode('utf-8') for p in rel_path.replace("\\", "/").split("/")]
-                        }
-                        info["files"].append(file_info)
-                        file_list.append((file_path, file_size))
-                
-                # 生成pieces
-                pieces = self._generate_pieces(file_list, piece_length)
+                info["files"], file_list = self._collect_files(manifest, sort_paths=version != "v1")
             else:
                 # 單文件模式
-                info["length"] = os.path.getsize(path)
-                pieces = self._generate_pieces([(path, info["length"])], piece_length)
+                info["length"] = manifest.total_size
+                file_list = [(path, info["length"])]
+            
+            piece_layers = None
+            if version == "v1":
+                # 生成pieces
+                pieces = self._generate_pieces(file_list, piece_length, start_piece=len(reuse) // 20)
+                info["pieces"] = bytes(reuse) + bytes(pieces)
+            else:
+                hashes = self._generate_merkle(file_list, piece_length, hybrid=version == "hybrid")
+                piece_layers = self._build_v2_info(info, hashes, hybrid=version == "hybrid")
+            
+            results = []
+            for profile in profiles:
+                result = self._write_torrent(path, info, profile, manifest, piece_layers)
+                if result:
+                    results.append(result)
+            return results
+            
+        except Exception as e:
+            logger.error(f"{self.plugin_name} 創建種子文件時出錯: {str(e)}")
+            return []
+
+    def _get_torrent_version(self, piece_length: int) -> str:
+        """種子格式，v2要求分片大小為不小於16KiB的2的冪，否則回退到v1"""
+        version = self._torrent_version if self._torrent_version in ("v2", "hybrid") else "v1"
+        if version != "v1" and not is_valid_v2_piece_length(piece_length):
+            logger.warning(f"{self.plugin_name} 分片大小 {piece_length} 不符合v2要求，使用v1格式")
+            return "v1"
+        return version
+
+    def _build_v2_info(self, info: dict, hashes: List[FileHashes], hybrid: bool) -> Dict[bytes, bytes]:
+        """填充v2的 file tree（混合模式同時填充帶填充文件的v1信息），返回 piece layers"""
+        piece_length = info["piece length"]
+        info["meta version"] = 2
+        
+        def file_entry(length: int, file_hashes: FileHashes) -> dict:
+            entry = {"length": length}
+            if length:
+                entry["pieces root"] = file_hashes.root
+            return {b"": entry}
+        
+        if "files" in info:
+            v1_files = info.pop("files")
+            file_tree = {}
+            for item, file_hashes in zip(v1_files, hashes):
+                node = file_tree
+                for part in item["path"]:
+                    node = node.setdefault(part, {})
+                node.update(file_entry(item["length"], file_hashes))
+        else:
+            v1_files = [{"length": info["length"]}]
+            file_tree = {info["name"]: file_entry(info["length"], hashes[0])}
+            if not hybrid:
+                info.pop("length")
+        info["file tree"] = file_tree
+        
+        if hybrid:
+            if "length" in info:
+                # 單文件種子末尾分片不補零
+                file_hashes = hashes[0]
+                info["pieces"] = file_hashes.v1_pieces[:-20] + file_hashes.v1_tail \
+                    if file_hashes.v1_tail else file_hashes.v1_pieces
+            else:
+                # 每個文件都用填充文件補齊到分片邊界（與libtorrent一致，包括最後一個文件），v1分片因此不跨文件
+                pieces = bytearray()
+                padded_files = []
+                for item, file_hashes in zip(v1_files, hashes):
+                    padded_files.append(item)
+                    pieces.extend(file_hashes.v1_pieces)
+                    pad = -item["length"] % piece_length
+                    if pad:
+                        padded_files.append({
+                            "attr": b"p",
+                            "length": pad,
+                            "path": [b".pad", str(pad).encode('utf-8')]
+                        })
+                info["files"] = padded_files
+                info["pieces"] = bytes(pieces)
+        
+        return {file_hashes.root: file_hashes.piece_layer for file_hashes in hashes if file_hashes.piece_layer}
+
+    @staticmethod
+    def _collect_files(manifest: ContentManifest,
+                       sort_paths: bool = False) -> Tuple[List[dict], List[Tuple[str, int]]]:
+        """
+        由文件清單生成種子文件列表及(路徑, 大小)列表
+        sort_paths 時按路徑整體排序，與v2 file tree的順序一致
+        """
+        files_info = []
+        file_list = []
+        for entry in manifest.entries:
+            files_info.append({
+                "length": entry.size,
+                "path": [p.encode('utf-8') for p in entry.parts]
+            })
+            file_list.append((entry.path, entry.size))
+        if sort_paths:
+            order = sorted(range(len(files_info)), key=lambda i: files_info[i]["path"])
+            files_info = [files_info[i] for i in order]
+            file_list = [file_list[i] for i in order]
+        return files_info, file_list
+
+    def _write_torrent(self, path: str, base_info: dict, profile: TorrentProfile, manifest: ContentManifest,
+                       piece_layers: Optional[Dict[bytes, bytes]] = None) -> Optional[TorrentResult]:
+        """按輸出配置生成並寫入種子文件，返回種子內容及info-hash"""
+        try:
+            info = dict(base_info)
+            
+            # 添加私有種子標識
+            if profile.private:
+                info["private"] = 1
             
-            info["pieces"] = bytes(pieces)
+            # 添加來源標識
+            if profile.source:
+                info["source"] = profile.source.encode('utf-8')
             
             # 創建torrent字典
             torrent = {
@@ -1673,45 +3249,68 @@ class PTSeeder(_PluginBase):
                 "encoding": "UTF-8".encode('utf-8')
             }
             
+            # v2分片層
+            if piece_layers:
+                torrent["piece layers"] = piece_layers
+            
             # 添加註釋
-            if self._comment:
-                torrent["comment"] = self._comment.encode('utf-8')
+            if profile.comment:
+                torrent["comment"] = profile.comment.encode('utf-8')
             
             # 添加tracker
-            if self._trackers:
-                tracker_list = [t.strip() for t in self._trackers.strip().split('\n') if t.strip()]
-                if tracker_list:
-                    torrent["announce"] = tracker_list[0].encode('utf-8')
-                    if len(tracker_list) > 1:
-                        torrent["announce-list"] = [[t.encode('utf-8')] for t in tracker_list]
+            if profile.trackers:
+                torrent["announce"] = profile.trackers[0].encode('utf-8')
+                if len(profile.trackers) > 1:
+                    torrent["announce-list"] = [[t.encode('utf-8')] for t in profile.trackers]
             
             # 生成種子文件路徑
-            torrent_name = f"{os.path.basename(path)}.torrent"
+            torrent_name = profile.torrent_name(os.path.basename(path))
             torrent_path = os.path.join(self._torrent_save_dir, torrent_name)
             
-            # 寫入種子文件
-            with open(torrent_path, "wb") as f:
-                f.write(bencodepy.encode(torrent))
+            # 編碼後的內容與info-hash保留在內存中，供後續環節使用
+            sorted_info = self._sort_keys(info)
+            info_hash, info_hash_v2 = self._hash_info(bencodepy.encode(sorted_info),
+                                                      v1=b'pieces' in sorted_info, v2=b'file tree' in sorted_info)
+            torrent["info"] = sorted_info
+            data = bencodepy.encode(self._sort_keys(torrent))
             
-            return torrent_path
+            # 寫入種子文件，先寫臨時文件再替換，更新時不會留下半寫入的種子；文件監控觸發時保存目錄可能尚未創建
+            os.makedirs(self._torrent_save_dir, exist_ok=True)
+            temp_path = f"{torrent_path}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, torrent_path)
+            
+            return TorrentResult(profile=profile,
+                                 content_path=path,
+                                 torrent_path=torrent_path,
+                                 data=data,
+                                 info_hash=info_hash,
+                                 info_hash_v2=info_hash_v2,
+                                 info=sorted_info,
+                                 manifest=manifest)
             
         except Exception as e:
-            logger.error(f"{self.plugin_name} 創建種子文件時出錯: {str(e)}")
+            logger.error(f"{self.plugin_name} 寫入種子文件 {profile.torrent_name(os.path.basename(path))} 時出錯: {str(e)}")
             return None
 
-    def _calculate_piece_size(self, path: str) -> int:
+    @classmethod
+    def _sort_keys(cls, value):
+        """按字節序排列字典鍵，bencode要求有序，v2的 file tree 否則會被客戶端拒絕"""
+        if isinstance(value, dict):
+            items = [(k.encode('utf-8') if isinstance(k, str) else k, v) for k, v in value.items()]
+            return {k: cls._sort_keys(v) for k, v in sorted(items, key=lambda item: item[0])}
+        if isinstance(value, list):
+            return [cls._sort_keys(v) for v in value]
+        return value
+
+    def _calculate_piece_size(self, manifest: ContentManifest) -> int:
         """計算合適的分片大小"""
         if self._piece_size > 0:
             return int(self._piece_size * 1024 * 1024)
         
         # 自動計算分片大小
-        total_size = 0
-        if os.path.isdir(path):
-            for root, dirs, files in os.walk(path):
-                for file in files:
-                    total_size += os.path.getsize(os.path.join(root, file))
-        else:
-            total_size = os.path.getsize(path)
+        total_size = manifest.total_size
         
         # 根據文件大小自動選擇分片大小
         if total_size < 50 * 1024 * 1024:  # < 50MB
@@ -1725,166 +3324,268 @@ class PTSeeder(_PluginBase):
         else:
             return 4 * 1024 * 1024  # 4MB
 
-    def _generate_pieces(self, file_list: List[Tuple[str, int]], piece_length: int) -> bytearray:
+    def _generate_pieces(self, file_list: List[Tuple[str, int]], piece_length: int,
+                         start_piece: int = 0) -> bytes:
         """生成pieces哈希"""
-        pieces = bytearray()
-        current_piece = bytearray()
-        
-        for file_path, file_size in file_list:
+        result = self._run_hash_job(self._hash_job(file_list, piece_length, "v1", start_piece))
+        logger.info(f"{self.plugin_name} 分片哈希完成：讀取 {result.bytes_hashed / 1024 / 1024:.2f} MB，"
+                    f"緩存命中 {result.bytes_cached / 1024 / 1024:.2f} MB，"
+                    f"耗時 {result.elapsed:.2f} 秒，{result.throughput:.2f} MB/s")
+        return result.pieces
+
+    def _generate_merkle(self, file_list: List[Tuple[str, int]], piece_length: int,
+                         hybrid: bool) -> List[FileHashes]:
+        """按文件並行生成v2默克爾樹"""
+        result = self._run_hash_job(self._hash_job(file_list, piece_length, "hybrid" if hybrid else "v2"))
+        logger.info(f"{self.plugin_name} v2默克爾樹計算完成：讀取 {result.bytes_hashed / 1024 / 1024:.2f} MB，"
+                    f"緩存命中 {result.bytes_cached / 1024 / 1024:.2f} MB，"
+                    f"耗時 {result.elapsed:.2f} 秒，{result.throughput:.2f} MB/s")
+        return result.files
+
+    def _hash_job(self, file_list: List[Tuple[str, int]], piece_length: int, version: str,
+                  start_piece: int = 0) -> HashJob:
+        """按當前配置構造哈希任務"""
+        return HashJob(file_list=file_list,
+                       piece_length=piece_length,
+                       version=version,
+                       start_piece=start_piece,
+                       workers=self._hash_workers,
+                       use_mmap=self._hash_mmap,
+                       readahead=self._hash_readahead,
+                       drop_cache=self._hash_drop_cache,
+                       cache_path=self._hash_cache_path if self._hash_cache else "",
+                       cache_bytes=self._hash_cache_size * 1024 * 1024)
+
+    def _run_hash_job(self, job: HashJob) -> HashResult:
+        """執行哈希任務，佔用所涉及設備的讀取名額；進程模式下工作進程崩潰時重建進程池並重試一次"""
+        if self._io_scheduler:
+            with self._io_scheduler.acquire(self._io_scheduler.devices([path for path, _ in job.file_list])):
+                return self._execute_hash_job(job)
+        return self._execute_hash_job(job)
+
+    def _execute_hash_job(self, job: HashJob) -> HashResult:
+        """在本進程或進程池中執行哈希任務"""
+        if self._hash_backend != "process":
+            return run_hash_job(job, cache=self._hash_cache)
+        for _ in range(2):
+            pool = self._get_process_pool()
+            # 經獨立包提交，工作進程反序列化任務時不導入插件包與 app
+            worker = hashworker.hasher_module()
             try:
-                with open(file_path, "rb") as f:
-                    while True:
-                        need_bytes = piece_length - len(current_piece)
-                        chunk = f.read(need_bytes)
-                        if not chunk:
-                            break
-                        
-                        current_piece.extend(chunk)
-                        
-                        if len(current_piece) == piece_length:
-                            pieces.extend(hashlib.sha1(current_piece).digest())
-                            current_piece = bytearray()
-            except Exception as e:
-                logger.error(f"{self.plugin_name} 讀取文件 {file_path} 時出錯: {e}")
-                continue
-        
-        # 處理最後一個不完整的piece
-        if current_piece:
-            pieces.extend(hashlib.sha1(current_piece).digest())
-        
-        return pieces
+                # 工作進程在 submit 中按需啟動，隱藏宿主入口模塊，子進程不重新導入 app
+                with hashworker.hidden_main():
+                    future = pool.submit(worker.run_hash_job, worker.HashJob(*job))
+                return future.result()
+            except BrokenProcessPool as e:
+                logger.warning(f"{self.plugin_name} 哈希工作進程異常退出，重建進程池: {e}")
+                self._shutdown_process_pool(pool)
+        raise RuntimeError("哈希工作進程連續異常退出")
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        """獲取哈希進程池，首次使用時創建"""
+        with self._pool_lock:
+            if not self._process_pool:
+                processes = self._hash_processes or default_hash_processes()
+                # spawn啟動的子進程不繼承主進程的線程與鎖，啟動後按路徑登記哈希模塊的獨立包
+                self._process_pool = ProcessPoolExecutor(max_workers=processes,
+                                                         mp_context=multiprocessing.get_context("spawn"),
+                                                         initializer=runpy.run_path,
+                                                         initargs=(hashworker.WORKER_PATH,))
+                logger.info(f"{self.plugin_name} 已啟動哈希進程池，進程數: {processes}")
+            return self._process_pool
 
-    def _add_to_qbittorrent(self, torrent_file: str, content_path: str) -> bool:
-        """添加種子到qBittorrent"""
+    def _shutdown_process_pool(self, pool: Optional[ProcessPoolExecutor] = None):
+        """關閉哈希進程池；指定 pool 時僅在其仍為當前進程池時關閉"""
+        with self._pool_lock:
+            if not self._process_pool or (pool and pool is not self._process_pool):
+                return
+            pool, self._process_pool = self._process_pool, None
+        pool.shutdown(wait=False)
+
+    def _submit_batch(self, items: List[SubmitItem]) -> List[bool]:
+        """將一批種子提交到當前下載器，返回與輸入同序的成功標記"""
+        if self._client_type == "qbittorrent":
+            return self._add_to_qbittorrent(items)
+        if self._client_type == "transmission":
+            return self._add_to_transmission(items)
+        return [False] * len(items)
+
+    def _add_to_qbittorrent(self, items: List[SubmitItem]) -> List[bool]:
+        """批量添加種子到qBittorrent：同一保存路徑的種子一次提交，再按哈希確認每個種子並統一設置限速"""
         if not qbittorrentapi:
             logger.error(f"{self.plugin_name} 未安裝qBittorrent API庫，無法添加種子")
-            return False
+            return [False] * len(items)
         
         try:
-            # 連接qBittorrent
-            qb = qbittorrentapi.Client(
-                host=self._qb_url,
-                username=self._qb_username,
-                password=self._qb_password
-            )
-            qb.auth_log_in()
+            # 復用長連接會話，首次使用時登錄
+            session = self._get_qb_session()
             
             # 準備添加參數
-            add_params = {
-                'torrent_files': torrent_file,
+            base_params = {
                 'is_skip_checking': self._skip_check,
                 'is_paused': not self._auto_start
             }
             
-            # 設置保存路徑
-            if self._qb_save_path:
-                add_params['save_path'] = self._qb_save_path
-            else:
-                add_params['save_path'] = os.path.dirname(content_path)
-            
             # 設置分類
             if self._qb_category:
-                add_params['category'] = self._qb_category
+                base_params['category'] = self._qb_category
             
             # 設置標籤
             if self._tags:
                 tags = [tag.strip() for tag in self._tags.split(",") if tag.strip()]
                 if tags:
-                    add_params['tags'] = tags
-            
-            # 添加種子
-            result = qb.torrents_add(**add_params)
-            
-            if result == "Ok.":
-                # 設置限速
-                if self._upload_limit > 0 or self._download_limit > 0:
-                    torrent_hash = self._get_torrent_hash(torrent_file)
-                    if torrent_hash:
-                        if self._upload_limit > 0:
-                            qb.torrents_set_upload_limit(limit=self._upload_limit * 1024, torrent_hashes=torrent_hash)
-                        if self._download_limit > 0:
-                            qb.torrents_set_download_limit(limit=self._download_limit * 1024, torrent_hashes=torrent_hash)
-                
-                logger.info(f"{self.plugin_name} 成功添加種子到qBittorrent: {os.path.basename(torrent_file)}")
-                return True
-            else:
-                logger.error(f"{self.plugin_name} 添加種子到qBittorrent失敗: {result}")
-                return False
+                    base_params['tags'] = tags
+            
+            # 保存路徑是每次請求的參數，按保存路徑分組提交
+            groups: Dict[str, List[SubmitItem]] = {}
+            for item in items:
+                save_path = self._qb_save_path or os.path.dirname(item.content_path)
+                groups.setdefault(save_path, []).append(item)
+            
+            for save_path, group in groups.items():
+                add_params = dict(base_params,
+                                  save_path=save_path,
+                                  torrent_files={os.path.basename(item.torrent_file): item.data or item.torrent_file
+                                                 for item in group})
+                try:
+                    result = session.call(lambda qb: qb.torrents_add(**add_params))
+                    if result != "Ok.":
+                        logger.error(f"{self.plugin_name} 添加 {len(group)} 個種子到qBittorrent失敗: {result}")
+                except Exception as e:
+                    logger.error(f"{self.plugin_name} 添加 {len(group)} 個種子到qBittorrent時出錯: {str(e)}")
+            
+            # 整批只返回成功與否，按哈希查詢確認每個種子是否已在下載器中
+            added = self._qb_present_hashes(session, [item.info_hash for item in items if item.info_hash])
+            results = [bool(item.info_hash) and item.info_hash in added for item in items]
+            
+            # 設置限速，一次請求覆蓋整批
+            hashes = [item.info_hash for item, ok in zip(items, results) if ok]
+            if hashes:
+                if self._upload_limit > 0:
+                    session.call(lambda qb: qb.torrents_set_upload_limit(
+                        limit=self._upload_limit * 1024, torrent_hashes=hashes))
+                if self._download_limit > 0:
+                    session.call(lambda qb: qb.torrents_set_download_limit(
+                        limit=self._download_limit * 1024, torrent_hashes=hashes))
+            
+            logger.info(f"{self.plugin_name} 批量添加種子到qBittorrent：成功 {len(hashes)} 個，共 {len(items)} 個")
+            return results
                 
         except Exception as e:
             logger.error(f"{self.plugin_name} 添加種子到qBittorrent時出錯: {str(e)}")
-            return False
+            return [False] * len(items)
 
-    def _add_to_transmission(self, torrent_file: str, content_path: str) -> bool:
-        """添加種子到Transmission"""
+    @staticmethod
+    def _qb_present_hashes(session: QbittorrentSession, hashes: List[str], attempts: int = 3) -> Set[str]:
+        """查詢已在qBittorrent中的種子哈希，新種子可能稍後才出現在列表中，缺失時短暫等待後重查"""
+        present = set()
+        for attempt in range(attempts):
+            missing = [torrent_hash for torrent_hash in hashes if torrent_hash not in present]
+            if not missing:
+                break
+            if attempt:
+                time.sleep(0.5)
+            torrents = session.call(lambda qb: qb.torrents_info(torrent_hashes=missing))
+            present.update(str(torrent.get('hash', '')).lower() for torrent in torrents)
+        return present
+
+    def _get_qb_session(self) -> QbittorrentSession:
+        """獲取qBittorrent長連接會話，首次使用時創建"""
+        with self._pool_lock:
+            if not self._qb_session:
+                self._qb_session = QbittorrentSession(host=self._qb_url,
+                                                      username=self._qb_username,
+                                                      password=self._qb_password)
+            return self._qb_session
+
+    def _close_qb_session(self):
+        """登出並丟棄qBittorrent會話"""
+        with self._pool_lock:
+            session, self._qb_session = self._qb_session, None
+        if session:
+            session.close()
+
+    def _add_to_transmission(self, items: List[SubmitItem]) -> List[bool]:
+        """批量添加種子到Transmission：RPC不支持一次添加多個種子，逐個添加後統一設置限速"""
         if not TransmissionClient:
             logger.error(f"{self.plugin_name} 未安裝Transmission RPC庫，無法添加種子")
-            return False
+            return [False] * len(items)
         
         try:
-            # 連接Transmission
+            # 連接Transmission，整批共用一個客戶端
             client = TransmissionClient(
                 host=self._tr_host,
                 port=self._tr_port,
                 username=self._tr_username if self._tr_username else None,
                 password=self._tr_password if self._tr_password else None
             )
-            
-            # 讀取種子文件
-            with open(torrent_file, "rb") as f:
-                torrent_data = f.read()
-            
-            # 準備添加參數
-            add_params = {
-                'torrent': torrent_data,
-                'paused': not self._auto_start
-            }
-            
-            # 設置下載目錄
-            if self._tr_download_dir:
-                add_params['download_dir'] = self._tr_download_dir
-            else:
-                add_params['download_dir'] = os.path.dirname(content_path)
-            
-            # 添加種子
-            result = client.add_torrent(**add_params)
-            
-            if hasattr(result, 'id'):
-                torrent_id = result.id
+        except Exception as e:
+            logger.error(f"{self.plugin_name} 連接Transmission時出錯: {str(e)}")
+            return [False] * len(items)
+        
+        results = []
+        torrent_ids = []
+        for item in items:
+            try:
+                # 種子內容，生成時已保留在內存中
+                torrent_data = item.data
+                if not torrent_data:
+                    with open(item.torrent_file, "rb") as f:
+                        torrent_data = f.read()
                 
-                # 設置限速
-                if self._upload_limit > 0 or self._download_limit > 0:
-                    client.change_torrent(
-                        torrent_id,
-                        uploadLimit=self._upload_limit if self._upload_limit > 0 else None,
-                        downloadLimit=self._download_limit if self._download_limit > 0 else None,
-                        uploadLimited=self._upload_limit > 0,
-                        downloadLimited=self._download_limit > 0
-                    )
+                # 準備添加參數
+                add_params = {
+                    'torrent': torrent_data,
+                    'paused': not self._auto_start
+                }
                 
-                logger.info(f"{self.plugin_name} 成功添加種子到Transmission: {os.path.basename(torrent_file)}")
-                return True
-            else:
-                logger.error(f"{self.plugin_name} 添加種子到Transmission失敗: 未獲取到種子ID")
-                return False
+                # 設置下載目錄
+                if self._tr_download_dir:
+                    add_params['download_dir'] = self._tr_download_dir
+                else:
+                    add_params['download_dir'] = os.path.dirname(item.content_path)
                 
-        except Exception as e:
-            logger.error(f"{self.plugin_name} 添加種子到Transmission時出錯: {str(e)}")
-            return False
+                # 添加種子
+                result = client.add_torrent(**add_params)
+                if hasattr(result, 'id'):
+                    torrent_ids.append(result.id)
+                    results.append(True)
+                else:
+                    logger.error(f"{self.plugin_name} 添加種子到Transmission失敗: 未獲取到種子ID")
+                    results.append(False)
+            except Exception as e:
+                logger.error(f"{self.plugin_name} 添加種子 {os.path.basename(item.torrent_file)} 到Transmission時出錯: {str(e)}")
+                results.append(False)
+        
+        # 設置限速，一次請求覆蓋整批
+        if torrent_ids and (self._upload_limit > 0 or self._download_limit > 0):
+            try:
+                client.change_torrent(
+                    torrent_ids,
+                    uploadLimit=self._upload_limit if self._upload_limit > 0 else None,
+                    downloadLimit=self._download_limit if self._download_limit > 0 else None,
+                    uploadLimited=self._upload_limit > 0,
+                    downloadLimited=self._download_limit > 0
+                )
+            except Exception as e:
+                logger.error(f"{self.plugin_name} 設置Transmission限速時出錯: {str(e)}")
+        
+        logger.info(f"{self.plugin_name} 批量添加種子到Transmission：成功 {len(torrent_ids)} 個，共 {len(items)} 個")
+        return results
 
-    def _get_torrent_hash(self, torrent_file: str) -> Optional[str]:
-        """獲取種子哈希值"""
-        try:
-            with open(torrent_file, "rb") as f:
-                torrent_data = bencodepy.decode(f.read())
-            info_hash = hashlib.sha1(bencodepy.encode(torrent_data[b'info'])).hexdigest()
-            return info_hash
-        except Exception:
-            return None
+    @staticmethod
+    def _hash_info(info_data: bytes, v1: bool, v2: bool) -> Tuple[str, str]:
+        """由編碼後的info計算(下載器種子ID, v2完整哈希)；純v2種子以截斷的SHA-256作為種子ID，混合種子沿用v1哈希"""
+        info_hash_v2 = hashlib.sha256(info_data).hexdigest() if v2 else ""
+        if not v1:
+            return info_hash_v2[:40], info_hash_v2
+        return hashlib.sha1(info_data).hexdigest(), info_hash_v2
 
-    def _get_pt_form_info(self, file_path: str) -> Dict[str, Any]:
-        """獲取PT站點發布表單需要的信息"""
+    def _get_pt_form_info(self, file_path: str, manifest: Optional[ContentManifest] = None) -> Dict[str, Any]:
+        """獲取PT站點發布表單需要的信息，manifest 為已掃描的文件清單"""
         try:
+            if manifest is None:
+                manifest = ContentManifest.scan(file_path)
             result = {}
             
             # 提取目錄名或文件名
@@ -1939,16 +3640,7 @@ class PTSeeder(_PluginBase):
                 result["字幕"] = "英文字幕"
             
             # 計算文件大小
-            if os.path.isdir(file_path):
-                total_size = 0
-                for root, dirs, files in os.walk(file_path):
-                    for file in files:
-                        try:
-                            total_size += os.path.getsize(os.path.join(root, file))
-                        except OSError:
-                            continue
-            else:
-                total_size = os.path.getsize(file_path)
+            total_size = manifest.total_size
             
             # 轉換為合適單位
             if total_size >= 1024 * 1024 * 1024 * 1024:  # TB
@@ -1959,23 +3651,18 @@ class PTSeeder(_PluginBase):
                 result["文件大小"] = f"{total_size / (1024 * 1024):.2f} MB"
             
             # 檢查是否有NFO文件並提取IMDB鏈接
-            if os.path.isdir(file_path):
-                for root, dirs, files in os.walk(file_path):
-                    for file in files:
-                        if file.lower().endswith('.nfo'):
-                            nfo_path = os.path.join(root, file)
-                            try:
-                                with open(nfo_path, "r", encoding="utf-8", errors="ignore") as f:
-                                    nfo_content = f.read()
-                                    # 提取IMDB ID
-                                    imdb_match = re.search(r'tt\d{7,8}', nfo_content)
-                                    if imdb_match:
-                                        result["IMDB鏈接"] = f"https://www.imdb.com/title/{imdb_match.group(0)}/"
-                                    break
-                            except Exception as e:
-                                logger.warning(f"{self.plugin_name} 讀取NFO文件失敗: {e}")
-                    if "IMDB鏈接" in result:
-                        break
+            if manifest.is_dir:
+                for nfo in manifest.nfo_files:
+                    try:
+                        with open(nfo.path, "r", encoding="utf-8", errors="ignore") as f:
+                            nfo_content = f.read()
+                        # 提取IMDB ID
+                        imdb_match = re.search(r'tt\d{7,8}', nfo_content)
+                        if imdb_match:
+                            result["IMDB鏈接"] = f"https://www.imdb.com/title/{imdb_match.group(0)}/"
+                            break
+                    except Exception as e:
+                        logger.warning(f"{self.plugin_name} 讀取NFO文件失敗: {e}")
             
             return result
             
@@ -1986,10 +3673,23 @@ class PTSeeder(_PluginBase):
     def _start_file_monitor(self):
         """啟動文件監控"""
         try:
-            if self._observer:
+            if self._observer or self._poller:
                 self.stop_service()
                 
+            self._stability = StabilityTracker(on_ready=self._on_release_ready,
+                                               min_wait=self._stable_min_wait,
+                                               max_wait=self._stable_max_wait)
+            self._stability.start()
             event_handler = FileCreatedHandler(self)
+            if self._use_polling():
+                self._poller = PollingWatcher(self._monitor_dir, event_handler,
+                                              interval=self._poll_interval,
+                                              cpu_budget=self._poll_budget / 1000,
+                                              exclude=self._should_exclude_dir)
+                self._poller.start()
+                logger.info(f"{self.plugin_name} 開始輪詢監控目錄: {self._monitor_dir}，"
+                            f"間隔 {self._poll_interval} 秒，CPU預算 {self._poll_budget} 毫秒")
+                return
             self._observer = Observer()
             self._observer.schedule(event_handler, self._monitor_dir, recursive=True)
             self._observer.start()
@@ -1998,6 +3698,25 @@ class PTSeeder(_PluginBase):
         except Exception as e:
             logger.error(f"{self.plugin_name} 啟動文件監控失敗: {e}")
 
+    def _use_polling(self) -> bool:
+        """是否使用輪詢監控，自動時網絡/FUSE掛載上 inotify 收不到其他主機的寫入"""
+        if self._watch_mode == "auto":
+            return MountTable().is_network(self._monitor_dir)
+        return self._watch_mode == "polling"
+
+    def _on_release_ready(self, path: str):
+        """文件監控跟蹤的發布寫入完成後加入處理隊列，隊列已滿時在此等待"""
+        try:
+            # 檢查目錄或文件是否仍然存在且為發布
+            if not self._is_release(path):
+                logger.debug(f"{self.plugin_name} {path} 不是發布，跳過處理")
+                return
+            if self._work_queue:
+                logger.info(f"{self.plugin_name} 新發布就緒，加入處理隊列: {path}")
+                self._work_queue.submit(path, source="watcher")
+        except Exception as e:
+            logger.error(f"{self.plugin_name} 提交新發布失敗: {e}")
+
     def _send_notification(self, msg: str, mtype: NotificationType = None):
         """發送通知"""
         if self._notify:
@@ -2015,11 +3734,44 @@ class PTSeeder(_PluginBase):
                 self._observer.stop()
                 self._observer.join(timeout=5)
                 self._observer = None
+            if self._poller:
+                self._poller.stop()
+                self._poller = None
+            if self._stability:
+                self._stability.stop()
+                self._stability = None
                 
             # 停止定時任務
             if self._scheduler and self._scheduler.running:
                 self._scheduler.shutdown(wait=False)
                 self._scheduler = None
+            
+            # 停止處理隊列，取消尚未開始的任務
+            if self._work_queue:
+                self._work_queue.stop()
+                self._work_queue = None
+            self._io_scheduler = None
+            
+            # 提交已收集的种子
+            if self._submitter:
+                self._submitter.stop()
+                self._submitter = None
+            
+            # 關閉哈希進程池
+            self._shutdown_process_pool()
+            
+            # 關閉下載器會話，配置可能已變化
+            self._close_qb_session()
+            
+            # 關閉掃描索引
+            if self._scan_index:
+                self._scan_index.close()
+                self._scan_index = None
+            
+            # 關閉分片哈希緩存
+            if self._hash_cache:
+                self._hash_cache.close()
+                self._hash_cache = None
                 
             logger.info(f"{self.plugin_name} 服務已停止")
             
@@ -2028,53 +3780,112 @@ class PTSeeder(_PluginBase):
 
 
 class FileCreatedHandler(FileSystemEventHandler):
-    """文件創建事件處理器"""
+    """
+    文件事件處理器：新建的發布目錄及上層目錄中的視頻文件交給就緒檢測跟蹤，已有發布中新增文件時跟蹤所屬發布，
+    所屬發布按掃描的發布識別規則自監控目錄向下查找（自動識別時可跨過分類目錄）；
+    改名或移入後成為發布的目錄與文件內容已完整，直接加入處理隊列；發布內的寫入事件刷新其活動時間
+    """
     
     def __init__(self, plugin: PTSeeder):
         super().__init__()
         self.plugin = plugin
 
     def on_created(self, event):
-        """處理文件創建事件"""
+        """處理創建事件"""
         try:
-            if event.is_directory:
-                logger.debug(f"{self.plugin.plugin_name} 檢測到新目錄: {event.src_path}")
-                
-                # 檢查是否是監控目錄的直接子目錄或需要處理的目錄
-                if self._should_process_directory(event.src_path):
-                    # 延遲處理，等待文件複製完成
-                    threading.Timer(30.0, self._delayed_process, [event.src_path]).start()
+            path = event.src_path
+            stability = self.plugin._stability
+            if self._is_new_release(path, event.is_directory):
+                logger.debug(f"{self.plugin.plugin_name} 檢測到新發布: {path}")
+                # 等待寫入完成後處理
+                stability.track(path)
+                return
+            release = None if event.is_directory else self._content_release(path)
+            if release:
+                # 已有發布中新增文件，寫入完成後重新處理所屬發布
+                stability.track(release)
+            else:
+                self._touch(path, event.is_directory)
+            
+        except Exception as e:
+            logger.error(f"{self.plugin.plugin_name} 文件監控事件處理失敗: {e}")
+
+    def on_moved(self, event):
+        """處理改名與移動：下載工具完成時通常將臨時名稱原子改名為最終名稱"""
+        try:
+            # 目錄移動時為其中內容補發的事件，由目錄本身的事件處理
+            if getattr(event, "is_synthetic", False):
+                return
+            src, dest = event.src_path, event.dest_path
+            stability = self.plugin._stability
+            stability.forget(src)
+            if self._is_new_release(dest, event.is_directory):
+                # 改名完成即已就緒，交給就緒檢測線程提交，不在監控線程中遍歷內容或等待隊列
+                logger.info(f"{self.plugin.plugin_name} 檢測到改名或移入的發布: {dest}")
+                stability.track(dest, immediate=True)
+                return
+            release = self._release_of(dest)
+            if not release:
+                return
+            if stability.is_tracking(release):
+                stability.rename(release, src, dest)
+            elif event.is_directory or self.plugin._is_candidate_path(dest):
+                stability.track(release)
             
         except Exception as e:
             logger.error(f"{self.plugin.plugin_name} 文件監控事件處理失敗: {e}")
 
+    def on_modified(self, event):
+        """寫入事件"""
+        self._touch(event.src_path, event.is_directory)
+
+    def on_closed(self, event):
+        """文件寫入後關閉（IN_CLOSE_WRITE）"""
+        self._touch(event.src_path, event.is_directory, closed=True)
+
+    def _touch(self, path: str, is_directory: bool, closed: bool = False):
+        """刷新跟蹤中的發布的活動時間：只查找路徑自身及各級上層目錄是否在跟蹤，不訪問文件系統"""
+        stability = self.plugin._stability
+        key = self.plugin._scan_key(path)
+        if not stability or not key or key[0] == os.pardir:
+            return
+        for depth in range(1, len(key) + 1):
+            release = os.path.join(self.plugin._monitor_dir, *key[:depth])
+            if stability.is_tracking(release):
+                stability.touch(release, "" if is_directory else path, closed)
+
+    def _release_of(self, path: str) -> Optional[str]:
+        """路徑所屬的發布目錄，與掃描的歸屬規則一致；不在任何發布目錄中時返回None"""
+        release = self.plugin._release_above(path)
+        if not release or release == self.plugin._torrent_save_dir:
+            return None
+        return release
+
+    def _content_release(self, path: str) -> Optional[str]:
+        """文件為已有發布目錄中新增的有效文件時，返回所屬發布"""
+        if not self.plugin._is_candidate_path(path):
+            return None
+        return self._release_of(path)
+
+    def _is_new_release(self, path: str, is_directory: bool) -> bool:
+        """路徑本身是否可能是一個新發布"""
+        if is_directory:
+            return self._should_process_directory(path)
+        return self.plugin._is_release_file(path, check_size=False)
+
     def _should_process_directory(self, dir_path: str) -> bool:
-        """判斷是否應該處理該目錄"""
+        """判斷目錄是否可能是一個發布"""
         # 跳過種子保存目錄
         if dir_path == self.plugin._torrent_save_dir:
             return False
         
         # 跳過排除目錄
         dir_name = os.path.basename(dir_path)
-        if self.plugin._should_exclude_dir(dir_name):
+        if self.plugin._should_exclude_dir(dir_name, "/".join(self.plugin._scan_key(os.path.dirname(dir_path)))):
             return False
         
-        # 只處理監控目錄下的直接子目錄
-        parent_dir = os.path.dirname(dir_path)
-        return parent_dir == self.plugin._monitor_dir
-
-    def _delayed_process(self, dir_path: str):
-        """延遲處理目錄"""
-        try:
-            # 檢查目錄是否仍然存在且有有效文件
-            if os.path.exists(dir_path):
-                files = os.listdir(dir_path)
-                if self.plugin._has_valid_files(dir_path, files):
-                    logger.info(f"{self.plugin.plugin_name} 開始處理新創建的目錄: {dir_path}")
-                    self.plugin._process_directory(dir_path)
-                else:
-                    logger.debug(f"{self.plugin.plugin_name} 目錄 {dir_path} 沒有有效文件，跳過處理")
-            
-        except Exception as e:
-            logger.error(f"{self.plugin.plugin_name} 延遲處理目錄失敗: {e}") 
-
+        # 固定層級時只處理該層級的目錄；自動識別時，上層目錄均不是發布的目錄都可能是發布（如分類目錄下的發布）
+        depth = len(self.plugin._scan_key(dir_path))
+        if self.plugin._release_depth:
+            return depth == self.plugin._release_depth
+        return depth >= 1 and self.plugin._release_above(dir_path) is None
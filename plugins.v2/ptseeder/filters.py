@@ -0,0 +1,108 @@
+import re
+from typing import List, Optional, Pattern
+
+_GLOB_CHARS = set("*?[")
+
+
+def glob_to_regex(pattern: str) -> str:
+    """
+    將glob路徑模式轉換為正則：** 匹配任意層目錄，* 和 ? 不跨目錄，[...] 為字符集；
+    不含 / 的模式匹配任意層級的文件或目錄名
+    """
+    pattern = pattern.strip().strip("/")
+    if "/" not in pattern:
+        pattern = "**/" + pattern
+    out = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i + 2)
+            if end < 0:
+                out.append(re.escape("["))
+                i += 1
+                continue
+            body = pattern[i + 1:end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end + 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(out)
+
+
+class ScanFilter:
+    """
+    掃描過濾規則，在 init_plugin 時編譯一次，供定時掃描與文件監控共用
+    排除目錄名與擴展名使用集合查找，路徑模式（如 **/Sample/**、*.part）合併為一個正則，
+    匹配相對監控目錄、以 / 分隔的路徑，不區分大小寫
+    """
+
+    def __init__(self, exclude_dirs: str = "", include_exts: str = "", min_file_size: float = 0,
+                 exclude_patterns: str = ""):
+        patterns: List[str] = []
+        self.exclude_names = set()
+        for item in self._split(exclude_dirs):
+            # 排除目錄中含通配符或路徑的條目按模式處理
+            if "/" in item or _GLOB_CHARS & set(item):
+                patterns.append(item)
+            else:
+                self.exclude_names.add(item)
+        patterns.extend(self._split(exclude_patterns))
+        self.patterns = patterns
+        self.include_exts = {ext.lower() for ext in self._split(include_exts)}
+        self.min_size_bytes = int(float(min_file_size or 0) * 1024 * 1024)
+        alternatives = "|".join(glob_to_regex(p) for p in patterns)
+        self._file_pattern: Optional[Pattern] = re.compile(
+            "^(?:" + alternatives + ")$", re.IGNORECASE) if patterns else None
+        # 目錄以 "目錄/" 匹配，末尾的 / 可選，使 **/Sample/** 與 **/Sample 都能排除 Sample 目錄本身
+        self._dir_pattern: Optional[Pattern] = re.compile(
+            "^(?:" + alternatives + ")/?$", re.IGNORECASE) if patterns else None
+
+    @staticmethod
+    def _split(value: str) -> List[str]:
+        """按逗號或換行拆分配置"""
+        return [item.strip() for item in re.split(r"[,\n]", value or "") if item.strip()]
+
+    @staticmethod
+    def _extension(name: str) -> str:
+        """小寫擴展名，與 os.path.splitext 一致（開頭的點不算擴展名）"""
+        dot = name.rfind(".")
+        if dot <= 0 or (name[0] == "." and not name[:dot].strip(".")):
+            return ""
+        return name[dot:].lower()
+
+    def exclude_dir(self, name: str, parent: str = "") -> bool:
+        """目錄是否排除，parent 為所在目錄相對監控目錄的路徑（/ 分隔）"""
+        if name in self.exclude_names:
+            return True
+        if self._dir_pattern is None:
+            return False
+        return self._dir_pattern.match(f"{parent}/{name}/" if parent else f"{name}/") is not None
+
+    def candidate_file(self, name: str, parent: str = "") -> bool:
+        """文件是否符合條件：非種子文件、擴展名在包含列表內且未被路徑模式排除"""
+        ext = self._extension(name)
+        if ext == ".torrent" or (self.include_exts and ext not in self.include_exts):
+            return False
+        if self._file_pattern is None:
+            return True
+        return self._file_pattern.match(f"{parent}/{name}" if parent else name) is None
+
+    def valid_size(self, size: int) -> bool:
+        """文件大小是否達到下限"""
+        return size >= self.min_size_bytes
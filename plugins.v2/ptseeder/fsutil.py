@@ -0,0 +1,135 @@
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+# 網絡/用戶態文件系統類型，這類掛載不適合mmap等依賴本地頁緩存的優化
+NETWORK_FS_TYPES = {
+    "nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "ceph", "glusterfs",
+    "afs", "davfs", "sshfs", "lustre", "beegfs", "gpfs"
+}
+
+_ESCAPE_PATTERN = re.compile(r"\\([0-7]{3})")
+
+
+@dataclass(frozen=True)
+class MountInfo:
+    """掛載點信息"""
+    mount_point: str
+    fstype: str
+    source: str
+    device: str  # major:minor
+    root: str  # 綁定掛載在源文件系統中的路徑
+
+    @property
+    def is_network(self) -> bool:
+        """是否為網絡或FUSE文件系統"""
+        return self.fstype in NETWORK_FS_TYPES or self.fstype.startswith("fuse")
+
+
+def _unescape(value: str) -> str:
+    """還原mountinfo中的八進制轉義（如 \\040 表示空格）"""
+    return _ESCAPE_PATTERN.sub(lambda m: chr(int(m.group(1), 8)), value)
+
+
+class MountTable:
+    """掛載點表，解析 /proc/self/mountinfo"""
+
+    def __init__(self, mountinfo: str = "/proc/self/mountinfo"):
+        self.mounts: List[MountInfo] = self._load(mountinfo)
+
+    @staticmethod
+    def _load(mountinfo: str) -> List[MountInfo]:
+        mounts = []
+        try:
+            with open(mountinfo, "r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    parts = line.split()
+                    if "-" not in parts:
+                        continue
+                    sep = parts.index("-")
+                    if sep < 6 or len(parts) < sep + 3:
+                        continue
+                    mounts.append(MountInfo(
+                        mount_point=_unescape(parts[4]),
+                        fstype=parts[sep + 1],
+                        source=_unescape(parts[sep + 2]),
+                        device=parts[2],
+                        root=_unescape(parts[3])
+                    ))
+        except OSError:
+            pass
+        # 最長掛載點優先匹配
+        mounts.sort(key=lambda m: len(m.mount_point), reverse=True)
+        return mounts
+
+    def find(self, path: str) -> Optional[MountInfo]:
+        """查找路徑所在的掛載點"""
+        real = os.path.realpath(path)
+        for mount in self.mounts:
+            mp = mount.mount_point
+            if real == mp or real.startswith(mp.rstrip("/") + "/"):
+                return mount
+        return None
+
+    def is_network(self, path: str) -> bool:
+        """路徑是否位於網絡或FUSE掛載上"""
+        mount = self.find(path)
+        return bool(mount and mount.is_network)
+
+
+class DeviceResolver:
+    """
+    將路徑解析為底層物理設備：綁定掛載與源路徑共享 st_dev，分區歸併到所屬磁盤，
+    mergerfs 通過 user.mergerfs.basepath 擴展屬性解析到實際分支
+    """
+
+    def __init__(self, mount_table: Optional[MountTable] = None, sys_block: str = "/sys/dev/block"):
+        self.mount_table = mount_table or MountTable()
+        self.sys_block = sys_block
+        self._disks: Dict[int, str] = {}
+        self._mergerfs = {m.device for m in self.mount_table.mounts if m.fstype == "fuse.mergerfs"}
+
+    def device_of(self, path: str) -> str:
+        """路徑所在的設備標識，無法解析時返回空字符串"""
+        try:
+            st_dev = os.stat(path).st_dev
+        except OSError:
+            return ""
+        if self._mergerfs and f"{os.major(st_dev)}:{os.minor(st_dev)}" in self._mergerfs:
+            branch = self._mergerfs_branch(path)
+            if branch:
+                try:
+                    st_dev = os.stat(branch).st_dev
+                except OSError:
+                    pass
+        return self._disk_of(st_dev)
+
+    def devices_of(self, paths: Iterable[str]) -> List[str]:
+        """多個路徑涉及的設備，已排序去重"""
+        return sorted({device for device in map(self.device_of, paths) if device})
+
+    @staticmethod
+    def _mergerfs_branch(path: str) -> Optional[str]:
+        """mergerfs 文件所在的分支路徑"""
+        if not hasattr(os, "getxattr"):
+            return None
+        try:
+            return os.fsdecode(os.getxattr(path, "user.mergerfs.basepath"))
+        except OSError:
+            return None
+
+    def _disk_of(self, st_dev: int) -> str:
+        """設備號對應的磁盤名，分區歸併到所屬磁盤；無塊設備的文件系統保留設備號"""
+        disk = self._disks.get(st_dev)
+        if disk is not None:
+            return disk
+        disk = f"{os.major(st_dev)}:{os.minor(st_dev)}"
+        sys_path = os.path.join(self.sys_block, disk)
+        if os.path.exists(sys_path):
+            real = os.path.realpath(sys_path)
+            if os.path.exists(os.path.join(real, "partition")):
+                real = os.path.dirname(real)
+            disk = os.path.basename(real)
+        self._disks[st_dev] = disk
+        return disk
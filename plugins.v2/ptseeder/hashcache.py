@@ -0,0 +1,210 @@
+import os
+import sys
+import time
+import logging
+import sqlite3
+import threading
+from typing import NamedTuple, Optional, Tuple
+
+if "app.log" in sys.modules:
+    from app.log import logger
+else:
+    # 哈希工作進程不導入 app，使用標準日誌
+    logger = logging.getLogger("ptseeder")
+
+
+class FileKey(NamedTuple):
+    """文件緩存鍵，任一字段變化都視為文件內容已變化"""
+    dev: int
+    ino: int
+    size: int
+    mtime_ns: int
+    piece_length: int
+    # 文件起始位置在所屬分片內的偏移，為0時文件與分片邊界對齊
+    phase: int = 0
+
+    @classmethod
+    def from_stat(cls, st: os.stat_result, piece_length: int, phase: int = 0) -> "FileKey":
+        return cls(st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, piece_length, phase)
+
+    @property
+    def head(self) -> int:
+        """文件開頭屬於跨文件分片的字節數"""
+        return (self.piece_length - self.phase) % self.piece_length
+
+    @property
+    def inner_pieces(self) -> int:
+        """完整落在文件內的分片數"""
+        return max(self.size - self.head, 0) // self.piece_length
+
+    @property
+    def tail(self) -> int:
+        """文件末尾不足一個分片的字節數"""
+        return max(self.size - self.head, 0) % self.piece_length
+
+    @property
+    def digest_length(self) -> int:
+        """緩存摘要的總字節數：文件內完整分片 + 末尾分片"""
+        return (self.inner_pieces + (1 if self.tail else 0)) * 20
+
+
+class PieceHashCache:
+    """
+    分片哈希持久化緩存（SQLite）
+    按文件及其在分片內的起始偏移，保存完整落在文件內的分片摘要以及末尾不完整分片
+    單獨計算的摘要，總容量超出上限時按最近訪問時間淘汰
+    """
+
+    def __init__(self, db_path: str, max_bytes: int):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS piece_hashes ("
+            "dev INTEGER NOT NULL, ino INTEGER NOT NULL, size INTEGER NOT NULL, "
+            "mtime_ns INTEGER NOT NULL, piece_length INTEGER NOT NULL, phase INTEGER NOT NULL, "
+            "digests BLOB NOT NULL, nbytes INTEGER NOT NULL, last_access REAL NOT NULL, "
+            "PRIMARY KEY (dev, ino, size, mtime_ns, piece_length, phase))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_piece_hashes_access ON piece_hashes (last_access)"
+        )
+        # v2默克爾樹與文件在種子中的位置無關，按文件保存
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS merkle_files ("
+            "dev INTEGER NOT NULL, ino INTEGER NOT NULL, size INTEGER NOT NULL, "
+            "mtime_ns INTEGER NOT NULL, piece_length INTEGER NOT NULL, "
+            "root BLOB NOT NULL, piece_layer BLOB NOT NULL, v1_pieces BLOB NOT NULL, v1_tail BLOB NOT NULL, "
+            "nbytes INTEGER NOT NULL, last_access REAL NOT NULL, "
+            "PRIMARY KEY (dev, ino, size, mtime_ns, piece_length))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_merkle_files_access ON merkle_files (last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key: FileKey) -> Optional[bytes]:
+        """查詢文件的分片摘要，命中時刷新訪問時間"""
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT digests FROM piece_hashes WHERE dev=? AND ino=? AND size=? "
+                    "AND mtime_ns=? AND piece_length=? AND phase=?", key
+                ).fetchone()
+                if not row:
+                    return None
+                digests = bytes(row[0])
+                if len(digests) != key.digest_length:
+                    return None
+                self._conn.execute(
+                    "UPDATE piece_hashes SET last_access=? WHERE dev=? AND ino=? AND size=? "
+                    "AND mtime_ns=? AND piece_length=? AND phase=?", (time.time(), *key)
+                )
+                self._conn.commit()
+                return digests
+            except sqlite3.Error as e:
+                logger.warning(f"PT种子生成器 讀取分片哈希緩存失敗: {e}")
+                return None
+
+    def put(self, key: FileKey, digests: bytes):
+        """寫入文件的分片摘要"""
+        if not digests or len(digests) != key.digest_length:
+            return
+        with self._lock:
+            try:
+                # 同一文件的舊版本記錄已失效
+                self._conn.execute(
+                    "DELETE FROM piece_hashes WHERE dev=? AND ino=? AND (size!=? OR mtime_ns!=?)",
+                    (key.dev, key.ino, key.size, key.mtime_ns)
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO piece_hashes "
+                    "(dev, ino, size, mtime_ns, piece_length, phase, digests, nbytes, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (*key, sqlite3.Binary(digests), len(digests), time.time())
+                )
+                self._evict()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"PT种子生成器 寫入分片哈希緩存失敗: {e}")
+
+    def get_merkle(self, key: FileKey, with_v1: bool) -> Optional[Tuple[bytes, bytes, bytes, bytes]]:
+        """查詢文件的v2默克爾樹：(根, 分片層, v1分片摘要, v1末尾摘要)"""
+        key = key[:5]
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT root, piece_layer, v1_pieces, v1_tail FROM merkle_files WHERE dev=? AND ino=? "
+                    "AND size=? AND mtime_ns=? AND piece_length=?", key
+                ).fetchone()
+                if not row:
+                    return None
+                # 僅計算過v2的記錄不能用於混合種子
+                if with_v1 and not row[2]:
+                    return None
+                self._conn.execute(
+                    "UPDATE merkle_files SET last_access=? WHERE dev=? AND ino=? AND size=? "
+                    "AND mtime_ns=? AND piece_length=?", (time.time(), *key)
+                )
+                self._conn.commit()
+                return tuple(bytes(value) for value in row)
+            except sqlite3.Error as e:
+                logger.warning(f"PT种子生成器 讀取默克爾樹緩存失敗: {e}")
+                return None
+
+    def put_merkle(self, key: FileKey, root: bytes, piece_layer: bytes, v1_pieces: bytes, v1_tail: bytes):
+        """寫入文件的v2默克爾樹"""
+        key = key[:5]
+        nbytes = len(root) + len(piece_layer) + len(v1_pieces) + len(v1_tail)
+        # 不含v1摘要時不覆蓋已有的完整記錄
+        verb = "INSERT OR REPLACE" if v1_pieces else "INSERT OR IGNORE"
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "DELETE FROM merkle_files WHERE dev=? AND ino=? AND (size!=? OR mtime_ns!=?)",
+                    (key[0], key[1], key[2], key[3])
+                )
+                self._conn.execute(
+                    f"{verb} INTO merkle_files "
+                    "(dev, ino, size, mtime_ns, piece_length, root, piece_layer, v1_pieces, v1_tail, "
+                    "nbytes, last_access) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (*key, sqlite3.Binary(root), sqlite3.Binary(piece_layer), sqlite3.Binary(v1_pieces),
+                     sqlite3.Binary(v1_tail), nbytes, time.time())
+                )
+                self._evict()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"PT种子生成器 寫入默克爾樹緩存失敗: {e}")
+
+    def _evict(self):
+        """按最近訪問時間淘汰，直到總容量不超過上限"""
+        total = self._conn.execute(
+            "SELECT (SELECT COALESCE(SUM(nbytes), 0) FROM piece_hashes) + "
+            "(SELECT COALESCE(SUM(nbytes), 0) FROM merkle_files)"
+        ).fetchone()[0]
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return
+        victims = {"piece_hashes": [], "merkle_files": []}
+        for table, rowid, nbytes, _ in self._conn.execute(
+                "SELECT 'piece_hashes', rowid, nbytes, last_access FROM piece_hashes "
+                "UNION ALL SELECT 'merkle_files', rowid, nbytes, last_access FROM merkle_files "
+                "ORDER BY last_access ASC").fetchall():
+            victims[table].append((rowid,))
+            excess -= nbytes
+            if excess <= 0:
+                break
+        for table, rowids in victims.items():
+            self._conn.executemany(f"DELETE FROM {table} WHERE rowid=?", rowids)
+
+    def close(self):
+        """關閉數據庫連接"""
+        with self._lock:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
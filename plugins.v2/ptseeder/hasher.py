@@ -0,0 +1,542 @@
+import os
+import sys
+import mmap
+import time
+import hashlib
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+if "app.log" in sys.modules:
+    from app.log import logger
+else:
+    # 哈希工作進程不導入 app，使用標準日誌
+    logger = logging.getLogger("ptseeder")
+
+from .fsutil import MountTable
+from .hashcache import FileKey, PieceHashCache
+
+
+def default_hash_workers() -> int:
+    """默認哈希線程數"""
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def _sha1_digest(data) -> bytes:
+    """計算單個分片的SHA-1（hashlib對大塊數據會釋放GIL）"""
+    return hashlib.sha1(data).digest()
+
+
+def _fadvise(fd: int, offset: int, length: int, advice: Optional[int]):
+    """發出posix_fadvise提示，不支持的平台忽略"""
+    if advice is None or not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fd, offset, length, advice)
+    except OSError:
+        pass
+
+
+_FADV_SEQUENTIAL = getattr(os, "POSIX_FADV_SEQUENTIAL", None)
+_FADV_WILLNEED = getattr(os, "POSIX_FADV_WILLNEED", None)
+_FADV_DONTNEED = getattr(os, "POSIX_FADV_DONTNEED", None)
+
+
+class _ReadAdvisor:
+    """順序讀取的頁緩存提示：預讀前方窗口，並釋放已讀取部分的頁緩存"""
+
+    def __init__(self, fd: int, window: int, drop_cache: bool):
+        self.fd = fd
+        self.window = window
+        self.drop_cache = drop_cache
+        self.hinted = 0
+        self.dropped = 0
+        _fadvise(fd, 0, 0, _FADV_SEQUENTIAL)
+
+    def advance(self, position: int):
+        """讀取位置前移後更新提示"""
+        # 預讀窗口消耗過半時再提示下一個窗口，減少系統調用
+        if self.window and position + self.window // 2 >= self.hinted:
+            _fadvise(self.fd, position, self.window, _FADV_WILLNEED)
+            self.hinted = position + self.window
+        # 數據已讀入緩衝區，頁緩存不再需要
+        if self.drop_cache and position > self.dropped:
+            _fadvise(self.fd, self.dropped, position - self.dropped, _FADV_DONTNEED)
+            self.dropped = position
+
+
+def _sha1_mapped(mapped: mmap.mmap, start: int, length: int, drop_fd: Optional[int] = None) -> bytes:
+    """直接從映射頁計算分片SHA-1，完成後丟棄已使用的頁"""
+    with memoryview(mapped) as view:
+        with view[start:start + length] as piece:
+            digest = hashlib.sha1(piece).digest()
+    if hasattr(mmap, "MADV_DONTNEED"):
+        # madvise起始地址必須按頁對齊，向上取整避免影響前一分片
+        aligned = -(-start // mmap.PAGESIZE) * mmap.PAGESIZE
+        end = start + length
+        if end > aligned:
+            try:
+                mapped.madvise(mmap.MADV_DONTNEED, aligned, end - aligned)
+            except (OSError, ValueError):
+                pass
+    if drop_fd is not None:
+        _fadvise(drop_fd, start, length, _FADV_DONTNEED)
+    return digest
+
+
+class PieceHasher:
+    """
+    分片哈希引擎
+    主線程按順序讀取分片，SHA-1計算交由有界線程池並行執行，摘要按分片順序寫回。
+    分片緩衝區預先分配並循環使用，通過readinto直接讀入，避免逐分片的拷貝與內存分配；
+    只有一個哈希線程時不經線程池，在讀取線程直接哈希緩衝區，單個緩衝區循環使用，省去線程切換。
+    開啟mmap模式時，本地文件內完整的分片直接從映射頁哈希；網絡掛載、空文件
+    以及跨文件邊界的分片仍走緩衝讀取。
+    讀取與哈希構成生產者/消費者流水線：讀取端最多領先 readahead 個分片，並通過
+    posix_fadvise 提示內核順序預讀，讀取完成後釋放頁緩存，避免大任務擠佔媒體服務的緩存。
+    提供緩存時，文件內完整的分片直接復用已保存的摘要，僅需讀取跨文件分片所在的首尾數據
+    """
+
+    def __init__(self, piece_length: int, workers: int = 0, use_mmap: bool = False,
+                 readahead: int = 0, drop_cache: bool = True,
+                 cache: Optional[PieceHashCache] = None):
+        self.piece_length = piece_length
+        self.use_mmap = use_mmap and hasattr(mmap.mmap, "madvise")
+        self.workers = workers if workers and workers > 0 else default_hash_workers()
+        # 在途分片上限（預讀深度），避免讀取速度遠超哈希速度時佔用過多內存
+        self.max_inflight = readahead if readahead and readahead > 0 else self.workers * 2
+        self.drop_cache = drop_cache
+        self.cache = cache
+        # 統計信息
+        self.bytes_hashed = 0
+        self.bytes_cached = 0
+        self.elapsed = 0.0
+
+    def hash_files(self, file_list: List[Tuple[str, int]], start_piece: int = 0) -> bytes:
+        """按順序哈希文件列表，返回拼接後的pieces；指定start_piece時從該分片開始計算"""
+        started = time.monotonic()
+        pieces = bytearray()
+        # 在途任務：(future, 緩衝區)
+        pending = deque()
+        # 空閒緩衝區，總數不超過 在途上限 + 1
+        free_buffers = []
+        allocated = 0
+        piece_length = self.piece_length
+        total = 0
+        cached_total = 0
+        # 已按順序提交的分片數
+        submitted = 0
+        # 待寫入緩存的文件：(緩存鍵, 首個文件內分片序號, 末尾分片摘要)
+        recordings = []
+        mounts = MountTable() if self.use_mmap else None
+        # 每個文件之後剩餘的數據量，用於判斷文件末尾分片是否為整個種子的最後一個分片
+        remaining_after = []
+        remaining = sum(size for _, size in file_list)
+        for _, size in file_list:
+            remaining -= size
+            remaining_after.append(remaining)
+        # 需要跳過的數據量
+        skip = start_piece * piece_length
+        # 單線程時在讀取線程內直接計算摘要
+        serial = self.workers == 1
+
+        with ThreadPoolExecutor(max_workers=self.workers,
+                                thread_name_prefix="ptseeder-hash") as executor:
+
+            def collect():
+                """按順序回收最早的摘要並歸還其緩衝區"""
+                future, buffer = pending.popleft()
+                pieces.extend(future.result())
+                # 映射分片沒有緩衝區需要歸還
+                if buffer is not None:
+                    free_buffers.append(buffer)
+
+            def acquire() -> memoryview:
+                """獲取一個可寫的分片緩衝區"""
+                nonlocal allocated
+                if not free_buffers:
+                    if allocated <= self.max_inflight:
+                        allocated += 1
+                        return memoryview(bytearray(piece_length))
+                    collect()
+                return free_buffers.pop()
+
+            def enqueue(future: Future, buffer: Optional[memoryview]):
+                nonlocal submitted
+                pending.append((future, buffer))
+                submitted += 1
+                while len(pending) > self.max_inflight:
+                    collect()
+
+            def submit(buffer: memoryview, length: int):
+                data = buffer if length == piece_length else buffer[:length]
+                if serial:
+                    emit(_sha1_digest(data))
+                    free_buffers.append(buffer)
+                    return
+                enqueue(executor.submit(_sha1_digest, data), buffer)
+
+            def submit_mapped(mapped: mmap.mmap, start: int, drop_fd: Optional[int]):
+                if serial:
+                    emit(_sha1_mapped(mapped, start, piece_length, drop_fd))
+                    return
+                enqueue(executor.submit(_sha1_mapped, mapped, start, piece_length, drop_fd), None)
+
+            def emit(digest: bytes):
+                """提交已知的分片摘要"""
+                future = Future()
+                future.set_result(digest)
+                enqueue(future, None)
+
+            def use_cached(f, key: FileKey, digests: bytes, is_last: bool, advisor: _ReadAdvisor):
+                """使用緩存的分片摘要，只讀取需與相鄰文件拼接的首尾數據"""
+                nonlocal cached_total
+                # 補齊上一文件遺留的跨文件分片
+                if key.head:
+                    read_buffered(f, advisor, until_boundary=True)
+                full = key.inner_pieces
+                for i in range(full):
+                    emit(digests[i * 20:(i + 1) * 20])
+                cached_total += full * piece_length
+                if not key.tail:
+                    return
+                if is_last:
+                    emit(digests[full * 20:])
+                    cached_total += key.tail
+                else:
+                    offset = key.head + full * piece_length
+                    f.seek(offset)
+                    advisor.dropped = offset
+                    read_buffered(f, advisor)
+
+            def read_buffered(f, advisor: _ReadAdvisor, until_boundary: bool = False):
+                """緩衝讀取到文件末尾，或僅補齊當前分片"""
+                nonlocal buffer, filled, total
+                while True:
+                    read = f.readinto(buffer[filled:])
+                    if not read:
+                        advisor.advance(f.tell())
+                        return
+
+                    filled += read
+                    total += read
+
+                    if filled == piece_length:
+                        submit(buffer, filled)
+                        buffer = acquire()
+                        filled = 0
+                        advisor.advance(f.tell())
+                        if until_boundary:
+                            return
+
+            def hash_mapped(f, file_path: str, advisor: _ReadAdvisor):
+                """哈希文件內完整落在本文件中的分片，剩餘部分交由緩衝讀取"""
+                nonlocal total
+                file_size = os.fstat(f.fileno()).st_size
+                if file_size < piece_length or mounts.is_network(file_path):
+                    return
+                # 先用緩衝讀取補齊跨文件邊界的分片
+                if filled:
+                    read_buffered(f, advisor, until_boundary=True)
+                    if filled:
+                        return
+                start = f.tell()
+                if file_size - start < piece_length:
+                    return
+                mapped = self._map_file(f)
+                if mapped is None:
+                    return
+                drop_fd = f.fileno() if self.drop_cache else None
+                try:
+                    while len(mapped) - start >= piece_length:
+                        submit_mapped(mapped, start, drop_fd)
+                        start += piece_length
+                        total += piece_length
+                    # 映射關閉前須等待所有引用它的哈希任務完成
+                    while pending:
+                        collect()
+                finally:
+                    mapped.close()
+                f.seek(start)
+                advisor.dropped = start
+
+            buffer = acquire()
+            filled = 0
+            for index, (file_path, file_size) in enumerate(file_list):
+                # 跳過起始分片之前的文件
+                if skip >= file_size and remaining_after[index]:
+                    skip -= file_size
+                    continue
+                try:
+                    with open(file_path, "rb", buffering=0) as f:
+                        st = os.fstat(f.fileno())
+                        advisor = _ReadAdvisor(f.fileno(), self.max_inflight * piece_length,
+                                               self.drop_cache)
+                        offset = skip
+                        if offset:
+                            f.seek(offset)
+                            advisor.hinted = advisor.dropped = offset
+                            skip = 0
+                        # 文件內沒有完整分片也沒有末尾分片時無需緩存
+                        key = None
+                        if self.cache and st.st_size > 0 and not offset:
+                            key = FileKey.from_stat(st, piece_length, filled)
+                            if not key.digest_length:
+                                key = None
+                        if key:
+                            digests = self.cache.get(key)
+                            if digests:
+                                use_cached(f, key, digests, not remaining_after[index], advisor)
+                                continue
+
+                        # 跨文件分片完成後即為首個文件內分片
+                        first_piece = submitted + (1 if key and key.head else 0)
+                        read_before = total
+                        if self.use_mmap:
+                            hash_mapped(f, file_path, advisor)
+                        read_buffered(f, advisor)
+
+                        # 完整讀取且期間未被修改的文件寫入緩存
+                        if key and total - read_before == st.st_size \
+                                and os.fstat(f.fileno()).st_mtime_ns == st.st_mtime_ns:
+                            tail_digest = _sha1_digest(buffer[:filled]) if filled else b""
+                            recordings.append((key, first_piece, tail_digest))
+                except Exception as e:
+                    logger.error(f"PT种子生成器 讀取文件 {file_path} 時出錯: {e}")
+                    continue
+
+            # 處理最後一個不完整的piece
+            if filled:
+                submit(buffer, filled)
+
+            while pending:
+                collect()
+
+        for key, first_piece, tail_digest in recordings:
+            inner = pieces[first_piece * 20:(first_piece + key.inner_pieces) * 20]
+            self.cache.put(key, bytes(inner) + tail_digest)
+
+        self.bytes_hashed = total
+        self.bytes_cached = cached_total
+        self.elapsed = time.monotonic() - started
+        return bytes(pieces)
+
+    @staticmethod
+    def _map_file(f) -> Optional[mmap.mmap]:
+        """以只讀方式映射文件並提示順序訪問，失敗時返回None回退到緩衝讀取"""
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            try:
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            except OSError:
+                pass
+        return mapped
+
+
+# BitTorrent v2 默克爾樹葉子塊大小
+BLOCK_SIZE = 16 * 1024
+
+
+class FileHashes(NamedTuple):
+    """單個文件的v2哈希結果"""
+    # 默克爾樹根，空文件為空字節串
+    root: bytes
+    # piece layers 中該文件的分片層哈希，文件不大於一個分片時為空
+    piece_layer: bytes
+    # 混合種子的v1分片摘要（末尾分片按零填充），僅混合模式計算
+    v1_pieces: bytes
+    # 末尾分片不填充時的v1摘要，用於種子的最後一個文件
+    v1_tail: bytes
+
+
+def _merkle_root(hashes: List[bytes], width: int, pad: bytes) -> bytes:
+    """按寬度（2的冪）以pad補齊後計算默克爾樹根"""
+    layer = list(hashes) + [pad] * (width - len(hashes))
+    while len(layer) > 1:
+        layer = [hashlib.sha256(layer[i] + layer[i + 1]).digest() for i in range(0, len(layer), 2)]
+    return layer[0]
+
+
+def _next_power_of_two(value: int) -> int:
+    """不小於value的最小2的冪"""
+    return 1 << max(value - 1, 0).bit_length()
+
+
+def is_valid_v2_piece_length(piece_length: int) -> bool:
+    """v2要求分片大小為不小於16KiB的2的冪"""
+    return piece_length >= BLOCK_SIZE and piece_length & (piece_length - 1) == 0
+
+
+class MerkleHasher:
+    """
+    BitTorrent v2 哈希引擎
+    每個文件獨立計算SHA-256默克爾樹（piece layers 與 pieces root），文件之間互不依賴，
+    因此可以完全並行；混合模式下同一次讀取同時計算按分片對齊填充的v1摘要
+    """
+
+    def __init__(self, piece_length: int, workers: int = 0, hybrid: bool = False,
+                 drop_cache: bool = True, cache: Optional[PieceHashCache] = None):
+        self.piece_length = piece_length
+        self.workers = workers if workers and workers > 0 else default_hash_workers()
+        self.hybrid = hybrid
+        self.drop_cache = drop_cache
+        self.cache = cache
+        self.blocks_per_piece = piece_length // BLOCK_SIZE
+        # 超出文件末尾的分片用全零葉子構成的子樹哈希補齊
+        self.pad_piece = _merkle_root([], self.blocks_per_piece, bytes(32))
+        # 統計信息
+        self.bytes_hashed = 0
+        self.bytes_cached = 0
+        self.elapsed = 0.0
+        self._stats_lock = threading.Lock()
+
+    def hash_files(self, file_list: List[Tuple[str, int]]) -> List[FileHashes]:
+        """並行哈希文件列表，結果與輸入順序一致"""
+        started = time.monotonic()
+        self.bytes_hashed = 0
+        self.bytes_cached = 0
+        with ThreadPoolExecutor(max_workers=self.workers,
+                                thread_name_prefix="ptseeder-merkle") as executor:
+            results = list(executor.map(lambda item: self._hash_file(item[0]), file_list))
+        self.elapsed = time.monotonic() - started
+        return results
+
+    def _hash_file(self, file_path: str) -> FileHashes:
+        """計算單個文件的默克爾樹，優先使用緩存"""
+        with open(file_path, "rb", buffering=0) as f:
+            st = os.fstat(f.fileno())
+            if not st.st_size:
+                return FileHashes(b"", b"", b"", b"")
+
+            key = FileKey.from_stat(st, self.piece_length)
+            if self.cache:
+                cached = self.cache.get_merkle(key, self.hybrid)
+                if cached:
+                    with self._stats_lock:
+                        self.bytes_cached += st.st_size
+                    return FileHashes(*cached)
+
+            piece_length = self.piece_length
+            buffer = memoryview(bytearray(piece_length))
+            advisor = _ReadAdvisor(f.fileno(), 4 * piece_length, self.drop_cache)
+            # 只保留第一個分片的葉子哈希，用於不大於一個分片的文件
+            first_leaves = []
+            piece_hashes = []
+            v1_pieces = bytearray()
+            v1_tail = b""
+            total = 0
+            while True:
+                filled = 0
+                while filled < piece_length:
+                    read = f.readinto(buffer[filled:])
+                    if not read:
+                        break
+                    filled += read
+                if not filled:
+                    break
+                total += filled
+                advisor.advance(total)
+
+                piece_leaves = [hashlib.sha256(buffer[i:min(i + BLOCK_SIZE, filled)]).digest()
+                                for i in range(0, filled, BLOCK_SIZE)]
+                if not piece_hashes:
+                    first_leaves = piece_leaves
+                piece_hashes.append(_merkle_root(piece_leaves, self.blocks_per_piece, bytes(32)))
+
+                if self.hybrid:
+                    if filled < piece_length:
+                        v1_tail = _sha1_digest(buffer[:filled])
+                        # 填充文件補齊的部分全部為零
+                        buffer[filled:] = bytes(piece_length - filled)
+                    v1_pieces.extend(_sha1_digest(buffer))
+                if filled < piece_length:
+                    break
+
+            if os.fstat(f.fileno()).st_mtime_ns != st.st_mtime_ns or total != st.st_size:
+                raise IOError(f"文件在哈希過程中發生變化: {file_path}")
+
+        if len(piece_hashes) == 1:
+            # 不大於一個分片的文件，葉子數補齊到2的冪即可，沒有分片層
+            root = _merkle_root(first_leaves, _next_power_of_two(len(first_leaves)), bytes(32))
+            piece_layer = b""
+        else:
+            root = _merkle_root(piece_hashes, _next_power_of_two(len(piece_hashes)), self.pad_piece)
+            piece_layer = b"".join(piece_hashes)
+
+        result = FileHashes(root, piece_layer, bytes(v1_pieces), v1_tail)
+        with self._stats_lock:
+            self.bytes_hashed += total
+        if self.cache:
+            self.cache.put_merkle(key, *result)
+        return result
+
+
+class HashJob(NamedTuple):
+    """一次哈希任務，可序列化後交給工作進程執行"""
+    file_list: List[Tuple[str, int]]
+    piece_length: int
+    # v1/v2/hybrid
+    version: str = "v1"
+    start_piece: int = 0
+    workers: int = 0
+    use_mmap: bool = False
+    readahead: int = 0
+    drop_cache: bool = True
+    # 工作進程按路徑打開自己的緩存連接，為空時不使用緩存
+    cache_path: str = ""
+    cache_bytes: int = 0
+
+
+class HashResult(NamedTuple):
+    """哈希任務結果"""
+    pieces: bytes  # v1分片摘要
+    files: List[FileHashes]  # v2/混合模式的逐文件結果
+    bytes_hashed: int
+    bytes_cached: int
+    elapsed: float
+
+    @property
+    def throughput(self) -> float:
+        """吞吐量(MB/s)"""
+        return self.bytes_hashed / 1024 / 1024 / self.elapsed if self.elapsed else 0.0
+
+
+# 工作進程內的緩存連接，按數據庫路徑復用
+_process_caches: Dict[str, PieceHashCache] = {}
+
+
+def default_hash_processes() -> int:
+    """默認哈希進程數"""
+    return max(1, min(2, os.cpu_count() or 1))
+
+
+def run_hash_job(job: HashJob, cache: Optional[PieceHashCache] = None) -> HashResult:
+    """執行哈希任務，進程池中以模塊級函數提交；未傳入緩存時按任務中的路徑打開"""
+    if cache is None and job.cache_path:
+        cache = _process_caches.get(job.cache_path)
+        if cache is None:
+            cache = PieceHashCache(job.cache_path, job.cache_bytes)
+            _process_caches[job.cache_path] = cache
+    if job.version == "v1":
+        hasher = PieceHasher(job.piece_length,
+                             workers=job.workers,
+                             use_mmap=job.use_mmap,
+                             readahead=job.readahead,
+                             drop_cache=job.drop_cache,
+                             cache=cache)
+        pieces = hasher.hash_files(job.file_list, start_piece=job.start_piece)
+        files = []
+    else:
+        hasher = MerkleHasher(job.piece_length,
+                              workers=job.workers,
+                              hybrid=job.version == "hybrid",
+                              drop_cache=job.drop_cache,
+                              cache=cache)
+        files = hasher.hash_files(job.file_list)
+        pieces = b""
+    return HashResult(bytes(pieces), files, hasher.bytes_hashed, hasher.bytes_cached, hasher.elapsed)
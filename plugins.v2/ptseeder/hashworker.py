@@ -0,0 +1,52 @@
+"""
+哈希工作進程入口：以獨立包名加載 hasher/hashcache/fsutil，不經插件包 __init__，也不導入 app
+進程池的初始化函數按文件路徑執行本模塊，提交的任務、函數與結果都引用獨立包下的類型；
+spawn 啟動的子進程默認會重新導入宿主的 __main__（MoviePilot 的 main.py 會導入整個 app），
+向進程池提交任務時以 hidden_main 暫時隱藏入口模塊，子進程只加載哈希所需的模塊
+"""
+import os
+import sys
+import types
+import threading
+import importlib
+from contextlib import contextmanager
+
+# 工作進程中哈希模塊所屬的包名
+PACKAGE = "ptseeder_hashworker"
+# 進程池初始化時按路徑執行本文件
+WORKER_PATH = os.path.abspath(__file__)
+
+# 替換 sys.modules['__main__'] 是進程級操作，多個線程同時提交時須串行
+_main_lock = threading.Lock()
+
+
+def register():
+    """登記獨立包，其子模塊從插件目錄加載"""
+    if PACKAGE not in sys.modules:
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [os.path.dirname(WORKER_PATH)]
+        sys.modules[PACKAGE] = package
+
+
+def hasher_module() -> types.ModuleType:
+    """獨立包下的 hasher 模塊，主進程以它構造提交給進程池的任務"""
+    register()
+    return importlib.import_module(PACKAGE + ".hasher")
+
+
+@contextmanager
+def hidden_main():
+    """
+    暫時以空模塊替換 __main__：進程池在 submit 中按需啟動工作進程，
+    此時生成的啟動數據不含入口模塊路徑，子進程不再執行宿主入口及其導入
+    """
+    with _main_lock:
+        main = sys.modules.get("__main__")
+        sys.modules["__main__"] = types.ModuleType("__main__")
+        try:
+            yield
+        finally:
+            sys.modules["__main__"] = main
+
+
+register()
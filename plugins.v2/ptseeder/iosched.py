@@ -0,0 +1,76 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence
+
+from .fsutil import DeviceResolver
+
+
+class DeviceScheduler:
+    """
+    按底層設備調度哈希讀取：同一設備上的任務限制並發（默認單流順序讀取，避免磁頭來回尋道），
+    不同設備之間並行
+    """
+
+    def __init__(self, per_device: int = 1, resolver: Optional[DeviceResolver] = None):
+        self.per_device = max(1, per_device)
+        self.resolver = resolver or DeviceResolver()
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        # 當前線程已持有的設備，處理隊列佔用設備後執行的哈希任務不再重複獲取
+        self._held = threading.local()
+
+    def devices(self, paths: Sequence[str]) -> List[str]:
+        """路徑涉及的設備"""
+        return self.resolver.devices_of(paths)
+
+    def _slot(self, device: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._slots.get(device)
+            if slot is None:
+                slot = self._slots[device] = threading.BoundedSemaphore(self.per_device)
+            return slot
+
+    def _held_devices(self) -> set:
+        held = getattr(self._held, "devices", None)
+        if held is None:
+            held = self._held.devices = set()
+        return held
+
+    @contextmanager
+    def acquire(self, devices: Sequence[str]):
+        """
+        佔用設備的讀取名額，按設備名順序獲取，跨設備任務之間不會死鎖；當前線程已持有的設備直接沿用
+        已持有名額時其餘設備只嘗試不等待地獲取，已滿則不佔名額直接讀取，避免與其他線程交叉等待
+        """
+        held = self._held_devices()
+        blocking = not held
+        acquired = []
+        try:
+            for device in sorted(set(devices) - held):
+                if not self._slot(device).acquire(blocking=blocking):
+                    continue
+                held.add(device)
+                acquired.append(device)
+            yield
+        finally:
+            self.release(acquired)
+
+    def try_acquire(self, devices: Sequence[str]) -> bool:
+        """不等待地佔用全部設備名額，任一設備已滿時放棄；成功後由當前線程持有，需調用 release 釋放"""
+        held = self._held_devices()
+        acquired = []
+        for device in sorted(set(devices) - held):
+            if not self._slot(device).acquire(blocking=False):
+                self.release(acquired)
+                return False
+            held.add(device)
+            acquired.append(device)
+        return True
+
+    def release(self, devices: Sequence[str]):
+        """釋放當前線程持有的設備名額"""
+        held = self._held_devices()
+        for device in reversed(list(devices)):
+            if device in held:
+                held.discard(device)
+                self._slot(device).release()
@@ -0,0 +1,100 @@
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+# 視頻文件擴展名
+VIDEO_EXTS = {
+    ".mkv", ".mp4", ".avi", ".rmvb", ".mov", ".ts", ".m2ts", ".wmv", ".flv",
+    ".mpg", ".mpeg", ".m4v", ".webm", ".vob", ".iso"
+}
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    """內容中的單個文件"""
+    path: str  # 絕對路徑
+    parts: Tuple[str, ...]  # 相對內容根目錄的路徑組件，單文件內容為文件名
+    size: int
+    dev: int
+    ino: int
+    mtime_ns: int
+    is_nfo: bool
+    is_video: bool
+
+
+@dataclass(frozen=True)
+class ContentManifest:
+    """
+    一次掃描得到的內容文件清單，供分片大小計算、種子生成、增量更新及發布信息共用
+    目錄內容的文件順序與 os.walk（目錄、文件均按名稱排序）一致
+    """
+    root: str
+    is_dir: bool
+    entries: Tuple[ManifestEntry, ...]
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.root)
+
+    @property
+    def total_size(self) -> int:
+        return sum(entry.size for entry in self.entries)
+
+    @property
+    def nfo_files(self) -> List[ManifestEntry]:
+        return [entry for entry in self.entries if entry.is_nfo]
+
+    @property
+    def video_files(self) -> List[ManifestEntry]:
+        return [entry for entry in self.entries if entry.is_video]
+
+    def by_path(self) -> Dict[str, ManifestEntry]:
+        """按絕對路徑索引"""
+        return {entry.path: entry for entry in self.entries}
+
+    @classmethod
+    def scan(cls, path: str) -> "ContentManifest":
+        """掃描文件或目錄，每個文件只stat一次；目錄不存在時拋出OSError"""
+        if not os.path.isdir(path):
+            st = os.stat(path)
+            name = os.path.basename(path)
+            return cls(root=path, is_dir=False, entries=(cls._entry(path, (name,), st),))
+        entries: List[ManifestEntry] = []
+        cls._scan_dir(path, (), entries)
+        return cls(root=path, is_dir=True, entries=tuple(entries))
+
+    @classmethod
+    def _scan_dir(cls, directory: str, parts: Tuple[str, ...], entries: List[ManifestEntry]):
+        """先收集本目錄文件，再依次遞歸子目錄（不跟隨目錄符號鏈接，與 os.walk 一致）"""
+        try:
+            with os.scandir(directory) as it:
+                items = sorted(it, key=lambda item: item.name)
+        except OSError:
+            return
+        subdirs = []
+        for item in items:
+            try:
+                if item.is_dir():
+                    if not item.is_symlink():
+                        subdirs.append(item)
+                    continue
+                st = item.stat()
+            except OSError:
+                continue
+            entries.append(cls._entry(item.path, parts + (item.name,), st))
+        for item in subdirs:
+            cls._scan_dir(item.path, parts + (item.name,), entries)
+
+    @staticmethod
+    def _entry(path: str, parts: Tuple[str, ...], st: os.stat_result) -> ManifestEntry:
+        ext = os.path.splitext(parts[-1])[1].lower()
+        return ManifestEntry(
+            path=path,
+            parts=parts,
+            size=st.st_size,
+            dev=st.st_dev,
+            ino=st.st_ino,
+            mtime_ns=st.st_mtime_ns,
+            is_nfo=ext == ".nfo",
+            is_video=ext in VIDEO_EXTS
+        )
@@ -0,0 +1,205 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from watchdog.events import (DirCreatedEvent, DirDeletedEvent, DirMovedEvent, FileCreatedEvent, FileDeletedEvent,
+                             FileModifiedEvent, FileMovedEvent, FileSystemEventHandler)
+
+from app.log import logger
+
+# 目錄項：(inode, 大小, 修改時間, 是否目錄)，目錄的大小與修改時間記為0
+Entry = Tuple[int, int, int, bool]
+
+
+def _cpu_time() -> float:
+    """當前線程的CPU時間，不支持時退回進程CPU時間"""
+    try:
+        return time.thread_time()
+    except (AttributeError, OSError):
+        return time.process_time()
+
+
+class _DirState:
+    """目錄快照"""
+    __slots__ = ("mtime_ns", "entries")
+
+    def __init__(self):
+        self.mtime_ns = -1
+        self.entries: Optional[Dict[str, Entry]] = None  # None 表示尚未建立基線
+
+
+class PollingWatcher:
+    """
+    快照對比輪詢監控，用於 inotify 不觸發事件的 NFS/SMB/FUSE 掛載
+    內存中保存每個目錄的修改時間及其目錄項 (inode, 大小, 修改時間)，每輪只stat目錄，
+    目錄修改時間變化時才重新列出並stat其中的文件，與快照對比後生成與 watchdog 相同的創建、刪除、改名事件；
+    目錄按輪轉順序檢查，每個輪詢週期的CPU時間不超過預算，超出部分下個週期繼續，大目錄樹分多個週期覆蓋
+    新發現的目錄首次列出時只建立基線，不對其內容產生事件（由目錄本身的事件處理）；
+    文件原地寫入不改變目錄修改時間，其變化由就緒檢測的內容快照判斷
+    """
+
+    def __init__(self, root: str, handler: FileSystemEventHandler, interval: float = 10, cpu_budget: float = 0.1,
+                 exclude: Optional[Callable[[str, str], bool]] = None):
+        self.root = root
+        self.interval = max(0.1, interval)
+        self.cpu_budget = max(0.001, cpu_budget)
+        self._handler = handler
+        self._exclude = exclude
+        self._dirs: Dict[str, _DirState] = {root: _DirState()}
+        self._order = deque([root])
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"polls": 0, "last_checked": 0, "last_scanned": 0, "last_cpu_ms": 0.0, "events": 0}
+
+    def start(self):
+        """啟動輪詢線程"""
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ptseeder-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止輪詢"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict[str, object]:
+        """快照規模與最近一輪的開銷"""
+        return dict(self._stats,
+                    dirs=len(self._dirs),
+                    entries=sum(len(state.entries) for state in self._dirs.values() if state.entries))
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"PT种子生成器 輪詢監控出錯: {e}")
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def poll(self) -> int:
+        """按預算檢查一批目錄並派發事件，返回檢查的目錄數"""
+        cpu_start = _cpu_time()
+        deadline = time.monotonic() + self.interval
+        added: List[Tuple[str, Entry]] = []
+        removed: Dict[Tuple[int, bool], str] = {}
+        modified: List[str] = []
+        checked = 0
+        scanned = 0
+        for _ in range(len(self._order)):
+            if checked and (_cpu_time() - cpu_start >= self.cpu_budget or time.monotonic() >= deadline):
+                break
+            path = self._order.popleft()
+            state = self._dirs.get(path)
+            if state is None:
+                continue
+            checked += 1
+            scanned += self._check(path, state, added, removed, modified)
+            if path in self._dirs:
+                self._order.append(path)
+        events = self._dispatch(added, removed, modified)
+        self._stats.update(polls=self._stats["polls"] + 1, last_checked=checked, last_scanned=scanned,
+                           last_cpu_ms=round((_cpu_time() - cpu_start) * 1000, 2),
+                           events=self._stats["events"] + events)
+        return checked
+
+    def _check(self, path: str, state: _DirState, added: List[Tuple[str, Entry]],
+               removed: Dict[Tuple[int, bool], str], modified: List[str]) -> int:
+        """檢查單個目錄，修改時間變化時重新列出並與快照對比，返回是否重新列出"""
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            # 目錄已刪除，由上級目錄的對比產生事件
+            self._drop(path)
+            return 0
+        if mtime_ns == state.mtime_ns and state.entries is not None:
+            return 0
+        entries = self._list(path)
+        if entries is None:
+            return 0
+        old = state.entries
+        state.mtime_ns = mtime_ns
+        state.entries = entries
+        for name, entry in entries.items():
+            child = os.path.join(path, name)
+            previous = old.get(name) if old is not None else None
+            if previous is not None and previous[0] == entry[0] and previous[3] == entry[3]:
+                if not entry[3] and previous[1:3] != entry[1:3]:
+                    modified.append(child)
+                continue
+            if previous is not None:
+                removed[(previous[0], previous[3])] = child
+                if previous[3]:
+                    self._drop(child)
+            if entry[3]:
+                self._add_dir(child)
+            if old is not None:
+                added.append((child, entry))
+        if old is not None:
+            for name, entry in old.items():
+                if name not in entries:
+                    child = os.path.join(path, name)
+                    removed[(entry[0], entry[3])] = child
+                    if entry[3]:
+                        self._drop(child)
+        return 1
+
+    def _list(self, path: str) -> Optional[Dict[str, Entry]]:
+        """列出目錄項，跳過排除目錄及目錄符號鏈接"""
+        rel = os.path.relpath(path, self.root)
+        parent = "" if rel == "." else rel.replace(os.sep, "/")
+        entries: Dict[str, Entry] = {}
+        try:
+            with os.scandir(path) as it:
+                for item in it:
+                    try:
+                        if item.is_dir():
+                            if item.is_symlink() or (self._exclude and self._exclude(item.name, parent)):
+                                continue
+                            entries[item.name] = (item.inode(), 0, 0, True)
+                        else:
+                            st = item.stat()
+                            entries[item.name] = (item.inode(), st.st_size, st.st_mtime_ns, False)
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.debug(f"PT种子生成器 輪詢讀取目錄 {path} 失敗: {e}")
+            return None
+        return entries
+
+    def _add_dir(self, path: str):
+        if path not in self._dirs:
+            self._dirs[path] = _DirState()
+            self._order.append(path)
+
+    def _drop(self, path: str):
+        """移除目錄及其子目錄的快照"""
+        prefix = path + os.sep
+        for key in [key for key in self._dirs if key == path or key.startswith(prefix)]:
+            del self._dirs[key]
+
+    def _dispatch(self, added: List[Tuple[str, Entry]], removed: Dict[Tuple[int, bool], str],
+                  modified: List[str]) -> int:
+        """同一inode在本輪中消失又出現視為改名，其餘為創建或刪除"""
+        events = []
+        for path, entry in added:
+            src = removed.pop((entry[0], entry[3]), None)
+            if src:
+                events.append(DirMovedEvent(src, path) if entry[3] else FileMovedEvent(src, path))
+            else:
+                events.append(DirCreatedEvent(path) if entry[3] else FileCreatedEvent(path))
+        for (_, is_dir), path in removed.items():
+            events.append(DirDeletedEvent(path) if is_dir else FileDeletedEvent(path))
+        events.extend(FileModifiedEvent(path) for path in modified)
+        for event in events:
+            try:
+                self._handler.dispatch(event)
+            except Exception as e:
+                logger.error(f"PT种子生成器 輪詢事件處理失敗: {e}")
+        return len(events)
@@ -0,0 +1,132 @@
+import threading
+import time
+from typing import Any, Callable, Dict, TypeVar
+
+from app.log import logger
+
+try:
+    import qbittorrentapi
+except ImportError:
+    qbittorrentapi = None
+
+T = TypeVar("T")
+
+# 會話空閒超過此時長(秒)後，使用前先做一次健康檢查
+HEALTH_CHECK_INTERVAL = 60
+
+
+class QbittorrentSession:
+    """
+    長期持有的 qBittorrent 客戶端
+    客戶端內部的 requests 會話保持 HTTP 長連接，所有種子共用一次登錄；
+    首次使用時才登錄，會話過期（403）時重新登錄後重試一次，連接異常時重建客戶端後重試一次，其他HTTP錯誤直接拋出；
+    空閒一段時間後使用前先用 app/version 檢查會話是否可用
+    """
+
+    def __init__(self, host: str, username: str = "", password: str = "", timeout: float = 30):
+        self.host = host
+        self._username = username
+        self._password = password
+        self._timeout = timeout
+        self._client = None
+        self._lock = threading.Lock()
+        self._last_ok = 0.0
+        self._stats = {"logins": 0, "requests": 0, "reconnects": 0, "last_error": ""}
+
+    def _connect(self):
+        """創建客戶端並登錄，調用方持有鎖"""
+        client = qbittorrentapi.Client(host=self.host,
+                                       username=self._username,
+                                       password=self._password,
+                                       REQUESTS_ARGS={"timeout": self._timeout})
+        client.auth_log_in()
+        self._stats["logins"] += 1
+        self._client = client
+        self._last_ok = time.monotonic()
+        return client
+
+    def client(self):
+        """獲取已登錄的客戶端，首次使用或空閒過久時檢查並按需重新登錄"""
+        with self._lock:
+            client = self._client
+            if client is None:
+                return self._connect()
+            if time.monotonic() - self._last_ok < HEALTH_CHECK_INTERVAL:
+                return client
+            try:
+                client.app_version()
+                self._last_ok = time.monotonic()
+                return client
+            except qbittorrentapi.Forbidden403Error:
+                client.auth_log_in()
+                self._stats["logins"] += 1
+                self._last_ok = time.monotonic()
+                return client
+            except Exception as e:
+                logger.info(f"PT种子生成器 qBittorrent 會話不可用，重新連接: {e}")
+                self._close_client()
+                self._stats["reconnects"] += 1
+                return self._connect()
+
+    def call(self, func: Callable[[Any], T]) -> T:
+        """
+        使用客戶端執行請求，會話過期(403)時重新登錄、連接異常時重新連接，各重試一次
+        其他HTTP錯誤（如409衝突、415無效種子）說明請求已被服務端拒絕，直接拋出，不重試非冪等的添加請求
+        """
+        client = self.client()
+        try:
+            result = func(client)
+        except qbittorrentapi.Forbidden403Error:
+            with self._lock:
+                if self._client is client:
+                    client.auth_log_in()
+                    self._stats["logins"] += 1
+            result = func(self.client())
+        except (qbittorrentapi.HTTPError, qbittorrentapi.LoginFailed) as e:
+            # HTTPError 與 LoginFailed 均繼承自 APIConnectionError，須先於連接異常處理
+            self._stats["last_error"] = str(e)
+            raise
+        except qbittorrentapi.APIConnectionError as e:
+            self._stats["last_error"] = str(e)
+            self.reset(client)
+            self._stats["reconnects"] += 1
+            result = func(self.client())
+        with self._lock:
+            self._stats["requests"] += 1
+            self._last_ok = time.monotonic()
+        return result
+
+    def status(self) -> Dict[str, Any]:
+        """連接統計，不發起請求"""
+        with self._lock:
+            return dict(self._stats,
+                        host=self.host,
+                        connected=self._client is not None,
+                        idle_seconds=round(time.monotonic() - self._last_ok, 1) if self._client else None)
+
+    def reset(self, client=None):
+        """丟棄客戶端，下次使用時重新連接；指定 client 時僅在其仍為當前客戶端時丟棄"""
+        with self._lock:
+            if client is None or client is self._client:
+                self._close_client()
+
+    def close(self):
+        """登出並關閉連接"""
+        with self._lock:
+            if self._client is not None:
+                try:
+                    self._client.auth_log_out()
+                except Exception:
+                    pass
+            self._close_client()
+
+    def _close_client(self):
+        client, self._client = self._client, None
+        if client is None:
+            return
+        session = getattr(client, "_http_session", None)
+        if session is not None and hasattr(session, "close"):
+            try:
+                session.close()
+            except Exception:
+                pass
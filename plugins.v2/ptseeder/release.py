@@ -0,0 +1,47 @@
+import os
+import re
+from typing import Iterable, List
+
+from .manifest import VIDEO_EXTS
+
+# 發布內部的結構性子目錄：分季、分碟及原盤目錄，含此類子目錄的目錄本身即為發布
+STRUCTURAL_DIR = re.compile(
+    r"^(?:season[\s._-]*\d+|s\d{1,2}|specials|第.{1,3}[季部]|"
+    r"(?:disc|disk|dvd|cd|bd)[\s._-]*\d+|bdmv|video_ts|audio_ts|certificate)$",
+    re.IGNORECASE
+)
+
+
+class ReleaseDetector:
+    """
+    從監控目錄中挑選發布單元，每個發布只生成一個種子，選中的目錄不再向下拆分
+    自動模式：監控目錄本身不是發布，其下第一個含有效文件或結構性子目錄（Season/Disc/BDMV/VIDEO_TS 等）的目錄為發布；
+    固定層級模式：監控目錄下第 depth 層的目錄為發布；
+    兩種模式下，上層目錄中散落的視頻文件各自作為單文件發布
+    """
+
+    def __init__(self, depth: int = 0):
+        self.depth = max(0, depth)
+
+    @staticmethod
+    def is_structural(name: str) -> bool:
+        """是否為發布內部的結構性子目錄"""
+        return STRUCTURAL_DIR.match(name) is not None
+
+    def is_release(self, depth: int, has_files: bool, children: Iterable[str]) -> bool:
+        """
+        判斷不屬於其他發布的目錄是否為發布
+        :param depth: 相對監控目錄的層級，監控目錄為0
+        :param has_files: 目錄下是否直接有有效文件
+        :param children: 子目錄名
+        """
+        if depth == 0:
+            return False
+        if self.depth:
+            return depth == self.depth
+        return has_files or any(self.is_structural(name) for name in children)
+
+    @staticmethod
+    def loose_files(files: Iterable[str]) -> List[str]:
+        """非發布目錄中直接存放的有效文件裡，作為單文件發布的視頻文件"""
+        return [path for path in files if os.path.splitext(path)[1].lower() in VIDEO_EXTS]
@@ -0,0 +1,162 @@
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import bencodepy
+
+from .manifest import ContentManifest
+
+# qBittorrent 分享率/做種時間限制沿用全局設置時的取值
+QB_USE_GLOBAL_LIMIT = -2
+
+
+def piece_count(info: Dict[bytes, Any]) -> int:
+    """種子的分片數：v1及混合種子按 pieces 計算，純v2種子各文件按分片邊界對齊"""
+    if b'pieces' in info:
+        return len(info[b'pieces']) // 20
+    piece_length = info[b'piece length']
+    count = 0
+    stack = [info[b'file tree']]
+    while stack:
+        node = stack.pop()
+        for name, child in node.items():
+            if name == b'':
+                count += -(-child[b'length'] // piece_length)
+            else:
+                stack.append(child)
+    return count
+
+
+def _sorted(value: Dict[bytes, Any]) -> Dict[bytes, Any]:
+    """bencode要求字典鍵有序"""
+    return {key: _sorted(value[key]) if isinstance(value[key], dict) else value[key] for key in sorted(value)}
+
+
+def _full_bitfield(count: int) -> bytes:
+    """全部置位的位圖，高位在前，末字節多餘的位為0"""
+    data = bytearray(b'\xff' * (count // 8))
+    if count % 8:
+        data.append((0xff << (8 - count % 8)) & 0xff)
+    return bytes(data)
+
+
+def file_mtimes(info: Dict[bytes, Any], manifest: ContentManifest) -> List[int]:
+    """按種子文件順序列出各文件的修改時間(秒)，填充文件不在磁盤上，記為0"""
+    if b'files' not in info:
+        return [manifest.entries[0].mtime_ns // 1000000000]
+    mtimes = {entry.parts: entry.mtime_ns // 1000000000 for entry in manifest.entries}
+    return [mtimes.get(tuple(part.decode('utf-8') for part in item[b'path']), 0) for item in info[b'files']]
+
+
+def qbittorrent_fastresume(info: Dict[bytes, Any], info_hash: str, info_hash_v2: str, save_path: str,
+                           trackers: Sequence[str] = (), category: str = "", tags: Sequence[str] = (),
+                           paused: bool = True, upload_limit: int = 0, download_limit: int = 0,
+                           ratio_limit: float = 0.0, seeding_time_limit: int = 0,
+                           added_time: Optional[int] = None) -> bytes:
+    """
+    生成qBittorrent的 .fastresume（libtorrent 恢復數據及 qBt- 擴展字段），所有分片標記為已完成
+    :param info: 已按鍵排序的種子 info 字典
+    :param info_hash: 下載器中的種子ID，v1及混合種子為SHA-1
+    :param info_hash_v2: v2及混合種子的完整SHA-256，v1種子為空
+    :param upload_limit: 上傳限速(字節/秒)，0表示不限制
+    :param download_limit: 下載限速(字節/秒)，0表示不限制
+    :param ratio_limit: 分享率限制，0表示沿用全局設置
+    :param seeding_time_limit: 做種時間限制(分鐘)，0表示沿用全局設置
+    """
+    now = int(time.time()) if added_time is None else added_time
+    resume = {
+        b'file-format': b'libtorrent resume file',
+        b'file-version': 1,
+        b'name': info[b'name'],
+        b'save_path': save_path.encode('utf-8'),
+        # 每個分片一個字節，1表示已擁有；分片剛由本插件計算，客戶端無需重新校驗
+        b'pieces': b'\x01' * piece_count(info),
+        b'paused': int(paused),
+        b'auto_managed': int(not paused),
+        b'seed_mode': 0,
+        b'allocation': b'sparse',
+        b'added_time': now,
+        b'completed_time': now,
+        b'total_uploaded': 0,
+        b'total_downloaded': 0,
+        b'active_time': 0,
+        b'seeding_time': 0,
+        b'finished_time': 0,
+        b'upload_rate_limit': upload_limit if upload_limit > 0 else -1,
+        b'download_rate_limit': download_limit if download_limit > 0 else -1,
+        b'max_connections': -1,
+        b'max_uploads': -1,
+        b'trackers': [[tracker.encode('utf-8')] for tracker in trackers],
+        b'qBt-savePath': save_path.encode('utf-8'),
+        b'qBt-category': category.encode('utf-8'),
+        b'qBt-tags': [tag.encode('utf-8') for tag in tags],
+        b'qBt-name': b'',
+        b'qBt-ratioLimit': int(ratio_limit * 1000) if ratio_limit > 0 else QB_USE_GLOBAL_LIMIT * 1000,
+        b'qBt-seedingTimeLimit': seeding_time_limit if seeding_time_limit > 0 else QB_USE_GLOBAL_LIMIT,
+        b'qBt-contentLayout': b'Original',
+        b'qBt-firstLastPiecePriority': 0,
+        b'qBt-seedStatus': 1,
+    }
+    # 純v2種子沒有v1哈希
+    if b'pieces' in info:
+        resume[b'info-hash'] = bytes.fromhex(info_hash)
+    if info_hash_v2:
+        resume[b'info-hash2'] = bytes.fromhex(info_hash_v2)
+    return bencodepy.encode(_sorted(resume))
+
+
+def transmission_resume(info: Dict[bytes, Any], manifest: ContentManifest, destination: str,
+                        paused: bool = True, upload_limit: int = 0, download_limit: int = 0,
+                        ratio_limit: float = 0.0, labels: Sequence[str] = (),
+                        added_time: Optional[int] = None) -> bytes:
+    """
+    生成Transmission的 .resume，全部區塊標記為已擁有、全部分片標記為已校驗
+    分片校驗狀態與各文件的修改時間綁定（4.x 的 mtimes/pieces，2.20-3.00 的 time-checked），
+    導入前文件被修改時，Transmission 只重新校驗該文件的分片
+    :param info: 已按鍵排序的種子 info 字典，需包含v1分片（Transmission 不支持純v2種子）
+    :param manifest: 生成種子時掃描的文件清單
+    :param upload_limit: 上傳限速(字節/秒)，0表示不限制
+    :param download_limit: 下載限速(字節/秒)，0表示不限制
+    :param ratio_limit: 分享率限制，0表示沿用全局設置
+    """
+    now = int(time.time()) if added_time is None else added_time
+    mtimes = file_mtimes(info, manifest)
+    resume = {
+        b'destination': destination.encode('utf-8'),
+        b'name': info[b'name'],
+        b'added-date': now,
+        b'done-date': now,
+        b'activity-date': now,
+        b'paused': int(paused),
+        b'uploaded': 0,
+        b'downloaded': 0,
+        b'corrupt': 0,
+        b'seeding-time-seconds': 0,
+        b'downloading-time-seconds': 0,
+        b'bandwidth-priority': 0,
+        b'dnd': [0] * len(mtimes),
+        b'priority': [0] * len(mtimes),
+        b'labels': [label.encode('utf-8') for label in labels],
+        b'speed-limit-up': {
+            b'speed-Bps': max(upload_limit, 0),
+            b'use-global-speed-limit': 1,
+            b'use-speed-limit': int(upload_limit > 0)
+        },
+        b'speed-limit-down': {
+            b'speed-Bps': max(download_limit, 0),
+            b'use-global-speed-limit': 1,
+            b'use-speed-limit': int(download_limit > 0)
+        },
+        # 比例模式：0沿用全局設置，1單獨設置；Transmission 以字符串保存浮點數
+        b'ratio-limit': {
+            b'ratio-limit': f"{ratio_limit:.6f}".encode('utf-8'),
+            b'ratio-mode': 1 if ratio_limit > 0 else 0
+        },
+        b'progress': {
+            b'blocks': b'all',
+            b'have': b'all',
+            b'pieces': _full_bitfield(piece_count(info)),
+            b'mtimes': mtimes,
+            b'time-checked': mtimes
+        }
+    }
+    return bencodepy.encode(_sorted(resume))
@@ -0,0 +1,91 @@
+import os
+import json
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from app.log import logger
+
+# 目錄狀態
+STATE_PENDING = "pending"  # 有有效文件或未達最小大小的候選文件，尚未成功生成種子
+STATE_DONE = "done"  # 已生成種子
+STATE_EMPTY = "empty"  # 沒有候選文件
+
+
+class DirRecord(NamedTuple):
+    """目錄掃描記錄"""
+    path: str
+    mtime_ns: int
+    size: int  # 目錄下直接有效文件的總大小
+    state: str
+    info_hash: str
+    children: List[str]  # 需要繼續掃描的子目錄名
+
+    def unchanged(self, mtime_ns: int) -> bool:
+        """目錄項未變化且無待處理內容時，可跳過列目錄與文件stat"""
+        return self.mtime_ns == mtime_ns and self.state in (STATE_DONE, STATE_EMPTY)
+
+
+class DirScan(NamedTuple):
+    """單個目錄的掃描結果"""
+    record: Optional[DirRecord]  # 新記錄，目錄未變化時為None
+    files: Optional[List[str]]  # 目錄待處理時的有效文件路徑
+    children: List[str]  # 子目錄名
+    calls: int  # 本次掃描的stat/scandir調用次數
+
+
+class ScanIndex:
+    """
+    目錄掃描狀態索引（SQLite）
+    目錄的 mtime 只在其直接子項增刪改名時變化，因此每次掃描仍需stat每個目錄，
+    但未變化目錄無需重新列出和stat其中的文件
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS directories ("
+            "path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, "
+            "state TEXT NOT NULL, info_hash TEXT NOT NULL DEFAULT '', children TEXT NOT NULL DEFAULT '[]')"
+        )
+        self._conn.commit()
+
+    def load(self) -> Dict[str, DirRecord]:
+        """讀取全部目錄記錄"""
+        with self._lock:
+            try:
+                rows = self._conn.execute(
+                    "SELECT path, mtime_ns, size, state, info_hash, children FROM directories"
+                ).fetchall()
+            except sqlite3.Error as e:
+                logger.warning(f"PT种子生成器 讀取掃描索引失敗: {e}")
+                return {}
+        return {row[0]: DirRecord(row[0], row[1], row[2], row[3], row[4], json.loads(row[5])) for row in rows}
+
+    def sync(self, records: Iterable[DirRecord], removed: Iterable[str]):
+        """寫入變化的記錄並刪除已不存在的目錄，單個事務提交"""
+        with self._lock:
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO directories (path, mtime_ns, size, state, info_hash, children) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(r.path, r.mtime_ns, r.size, r.state, r.info_hash,
+                      json.dumps(r.children, ensure_ascii=False)) for r in records]
+                )
+                self._conn.executemany("DELETE FROM directories WHERE path=?", [(path,) for path in removed])
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"PT种子生成器 寫入掃描索引失敗: {e}")
+
+    def close(self):
+        """關閉數據庫連接"""
+        with self._lock:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
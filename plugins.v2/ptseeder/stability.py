@@ -0,0 +1,201 @@
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.log import logger
+
+# 內容快照：(文件數, 總大小, 最新修改時間)
+Snapshot = Tuple[int, int, int]
+
+# 未關閉的寫入文件超過此時長(秒)沒有新事件時不再阻塞就緒（如只修改了屬性、寫入進程異常退出）
+STALLED_WRITER = 300
+
+
+def content_snapshot(path: str) -> Optional[Snapshot]:
+    """統計文件或目錄下所有文件的數量、總大小及最新修改時間，路徑不存在時返回None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if not os.path.isdir(path):
+        return 1, st.st_size, st.st_mtime_ns
+    count = 0
+    size = 0
+    mtime_ns = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                file_st = os.stat(os.path.join(root, name))
+            except OSError:
+                continue
+            count += 1
+            size += file_st.st_size
+            mtime_ns = max(mtime_ns, file_st.st_mtime_ns)
+    return count, size, mtime_ns
+
+
+@dataclass
+class _Pending:
+    """跟蹤中的發布"""
+    first_seen: float
+    last_activity: float
+    snapshot: Optional[Snapshot]
+    writers: Dict[str, float] = field(default_factory=dict)  # 有寫入事件但尚未關閉的文件 -> 最近寫入時間
+    immediate: bool = False  # 不等待靜止期，下一輪檢查直接就緒
+    measured: bool = False  # 已由檢測線程統計首個快照
+
+
+class StabilityTracker:
+    """
+    發布內容就緒檢測，取代固定延遲
+    寫入事件（修改、IN_CLOSE_WRITE）及文件數、大小、修改時間的變化都會刷新發布的最近活動時間；
+    發布在最近活動後保持靜止 min_wait 秒、且沒有未關閉的寫入文件時視為就緒，
+    複製持續超過 max_wait 秒仍未穩定時不再等待；只有觀察到關閉事件後才按未關閉文件判斷，兼容不支持該事件的平台
+    """
+
+    def __init__(self, on_ready: Callable[[str], None], min_wait: float = 10, max_wait: float = 7200,
+                 interval: float = 1.0, snapshot: Callable[[str], Optional[Snapshot]] = content_snapshot):
+        self._on_ready = on_ready
+        self.min_wait = max(0.0, min_wait)
+        self.max_wait = max(self.min_wait, max_wait)
+        self._interval = interval
+        self._snapshot = snapshot
+        self._pending: Dict[str, _Pending] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._close_events = False
+
+    def start(self):
+        """啟動檢測線程"""
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ptseeder-stability", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止檢測線程，放棄所有跟蹤中的發布"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        with self._lock:
+            self._pending.clear()
+
+    def track(self, path: str, immediate: bool = False):
+        """
+        開始跟蹤發布，已在跟蹤時視為一次活動
+        只登記不統計內容，首個快照由檢測線程在下一輪獲取，調用方（文件監控線程）不遍歷發布；
+        immediate 為 True 時不統計內容、不等待靜止期，由檢測線程在下一輪交給 on_ready（如原子改名完成的發布）
+        """
+        now = time.monotonic()
+        with self._lock:
+            pending = self._pending.get(path)
+            if pending:
+                pending.last_activity = now
+                pending.immediate = pending.immediate or immediate
+                return
+            self._pending[path] = _Pending(first_seen=now, last_activity=now, snapshot=None, immediate=immediate)
+
+    def touch(self, path: str, file_path: str = "", closed: bool = False):
+        """記錄發布內的寫入活動，closed 表示文件已關閉寫入"""
+        with self._lock:
+            pending = self._pending.get(path)
+            if not pending:
+                return
+            pending.last_activity = time.monotonic()
+            if not file_path:
+                return
+            if closed:
+                self._close_events = True
+                pending.writers.pop(file_path, None)
+            else:
+                pending.writers[file_path] = pending.last_activity
+
+    def rename(self, path: str, src: str, dest: str):
+        """發布內文件改名，視為一次活動；未關閉的寫入文件跟隨新名稱"""
+        with self._lock:
+            pending = self._pending.get(path)
+            if not pending:
+                return
+            pending.last_activity = time.monotonic()
+            if src in pending.writers:
+                pending.writers[dest] = pending.writers.pop(src)
+
+    def forget(self, path: str):
+        """停止跟蹤發布（已改名或已直接處理）"""
+        with self._lock:
+            self._pending.pop(path, None)
+
+    def is_tracking(self, path: str) -> bool:
+        """發布是否仍在等待就緒"""
+        with self._lock:
+            return path in self._pending
+
+    def tracking(self) -> List[str]:
+        """跟蹤中的發布"""
+        with self._lock:
+            return list(self._pending)
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"PT种子生成器 就緒檢測出錯: {e}")
+
+    def check(self, now: Optional[float] = None):
+        """檢查一輪，返回本輪就緒的發布"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            fresh = [(path, pending) for path, pending in self._pending.items()
+                     if not pending.measured and not pending.immediate]
+        # 新跟蹤的發布先統計首個快照，作為之後比較的基準，本輪不再判斷就緒
+        for path, pending in fresh:
+            snapshot = self._snapshot(path)
+            with self._lock:
+                if self._pending.get(path) is pending:
+                    pending.snapshot = snapshot
+                    pending.measured = True
+        with self._lock:
+            measured = {path for path, _ in fresh}
+            candidates = [(path, pending) for path, pending in self._pending.items()
+                          if pending.immediate or path not in measured and pending.measured
+                          and (now - pending.last_activity >= self.min_wait or now - pending.first_seen >= self.max_wait)]
+        ready = []
+        for path, pending in candidates:
+            if pending.immediate:
+                with self._lock:
+                    if self._pending.get(path) is pending:
+                        del self._pending[path]
+                        ready.append(path)
+                continue
+            timeout = now - pending.first_seen >= self.max_wait
+            # 靜止期滿才重新統計，大發布不必每輪遍歷
+            snapshot = self._snapshot(path)
+            with self._lock:
+                if self._pending.get(path) is not pending:
+                    continue
+                if snapshot is None:
+                    logger.info(f"PT种子生成器 {path} 已不存在，停止等待")
+                    del self._pending[path]
+                    continue
+                if not timeout:
+                    if snapshot != pending.snapshot:
+                        pending.snapshot = snapshot
+                        pending.last_activity = now
+                        continue
+                    if self._close_events and any(now - last < STALLED_WRITER for last in pending.writers.values()):
+                        # 仍有文件未關閉，下一個靜止期後再檢查
+                        pending.last_activity = now
+                        continue
+                else:
+                    logger.warning(f"PT种子生成器 {path} 等待 {self.max_wait:.0f} 秒仍未穩定，開始處理")
+                del self._pending[path]
+            ready.append(path)
+        for path in ready:
+            self._on_ready(path)
+        return ready
@@ -0,0 +1,108 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from app.log import logger
+
+# 單批最多提交的種子數
+MAX_BATCH = 50
+
+
+class SubmitItem(NamedTuple):
+    """待提交到下載器的種子"""
+    torrent_file: str
+    content_path: str
+    info_hash: str  # 下載器中的種子哈希，用於確認每個種子是否添加成功
+    data: bytes = b""  # 種子文件內容，為空時從 torrent_file 讀取
+
+
+class SubmitBatcher:
+    """
+    下載器提交批處理：收集一個短時間窗口內完成的種子，整批交給 flush 提交
+    flush 返回與輸入同序的成功標記，每個種子的 Future 按各自結果完成，部分失敗時可逐個看到
+    """
+
+    def __init__(self, flush: Callable[[List[SubmitItem]], List[bool]], window: float = 2.0,
+                 max_batch: int = MAX_BATCH):
+        self._flush = flush
+        self.window = max(0.0, window)
+        self.max_batch = max(1, max_batch)
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[SubmitItem, Future]] = []
+        self._first_at = 0.0
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"batches": 0, "submitted": 0, "succeeded": 0, "failed": 0, "last_batch": 0}
+
+    def start(self):
+        """啟動提交線程"""
+        with self._cond:
+            if self._thread:
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="ptseeder-submit", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 30):
+        """停止前提交所有已收集的種子"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            thread, self._thread = self._thread, None
+        if thread:
+            thread.join(timeout=timeout)
+
+    def submit(self, item: SubmitItem) -> Future:
+        """加入當前批次，返回該種子是否添加成功的 Future"""
+        future = Future()
+        with self._cond:
+            if self._stopped:
+                future.set_result(False)
+                return future
+            if not self._pending:
+                self._first_at = time.monotonic()
+            self._pending.append((item, future))
+            self._stats["submitted"] += 1
+            self._cond.notify_all()
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        """提交統計"""
+        with self._cond:
+            return dict(self._stats, pending=len(self._pending), window=self.window)
+
+    def _take(self) -> List[Tuple[SubmitItem, Future]]:
+        """等待窗口結束或批次已滿，取出一批；停止且無待提交時返回空"""
+        with self._cond:
+            while True:
+                if self._pending:
+                    remaining = self._first_at + self.window - time.monotonic()
+                    if self._stopped or remaining <= 0 or len(self._pending) >= self.max_batch:
+                        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+                        self._first_at = time.monotonic()
+                        return batch
+                    self._cond.wait(remaining)
+                elif self._stopped:
+                    return []
+                else:
+                    self._cond.wait()
+
+    def _run(self):
+        while True:
+            batch = self._take()
+            if not batch:
+                return
+            items = [item for item, _ in batch]
+            try:
+                results = self._flush(items)
+            except Exception as e:
+                logger.error(f"PT种子生成器 批量提交種子失敗: {e}")
+                results = [False] * len(items)
+            with self._cond:
+                self._stats["batches"] += 1
+                self._stats["last_batch"] = len(items)
+                self._stats["succeeded"] += sum(1 for ok in results if ok)
+                self._stats["failed"] += sum(1 for ok in results if not ok)
+            for (_, future), ok in zip(batch, results):
+                future.set_result(bool(ok))
@@ -0,0 +1,172 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from app.log import logger
+
+from .iosched import DeviceScheduler
+
+
+@dataclass
+class _WorkItem:
+    """隊列中的任務"""
+    path: str
+    future: Future
+    paths: List[str]
+    devices: List[str]
+    enqueued: float
+    sources: List[str] = field(default_factory=list)
+
+
+class WorkQueue:
+    """
+    文件監控與定時任務共用的處理隊列
+    按內容路徑去重：已在隊列中的路徑合併為同一任務並返回同一 Future；正在處理的路徑再次提交時排隊，處理完成後再執行一次；
+    固定數量的工作線程處理，優先取所涉及設備有空閒名額的任務，同一設備不會被多個工作線程同時佔滿；
+    隊列達到上限時提交方阻塞等待（背壓），等待次數與時長計入統計
+    """
+
+    def __init__(self, func: Callable[[str], Any], workers: int = 4, limit: int = 0,
+                 scheduler: Optional[DeviceScheduler] = None):
+        self._func = func
+        self.workers = max(1, workers)
+        self.limit = max(0, limit)
+        self._scheduler = scheduler
+        self._cond = threading.Condition()
+        self._queue: "OrderedDict[str, _WorkItem]" = OrderedDict()
+        self._running: Dict[str, _WorkItem] = {}
+        self._threads: List[threading.Thread] = []
+        self._stopped = False
+        self._stats = {
+            "submitted": 0,
+            "coalesced": 0,
+            "completed": 0,
+            "failed": 0,
+            "blocked": 0,
+            "blocked_seconds": 0.0,
+            "max_depth": 0
+        }
+
+    def start(self):
+        """啟動工作線程"""
+        with self._cond:
+            if self._threads:
+                return
+            self._stopped = False
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"ptseeder-worker-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: float = 5):
+        """停止隊列，取消尚未開始的任務，正在處理的任務完成後工作線程退出"""
+        with self._cond:
+            self._stopped = True
+            for item in self._queue.values():
+                item.future.cancel()
+            self._queue.clear()
+            self._cond.notify_all()
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout=timeout)
+
+    def submit(self, path: str, paths: Sequence[str] = (), source: str = "") -> Future:
+        """
+        提交內容路徑，返回處理結果的 Future
+        :param paths: 內容涉及的文件，用於確定所在設備，為空時按內容路徑確定
+        :param source: 提交來源，僅用於日誌與統計
+        """
+        # 設備解析需要stat，在鎖外完成
+        paths = list(paths) or [path]
+        devices = self._scheduler.devices(paths) if self._scheduler else []
+        with self._cond:
+            item = self._queue.get(path)
+            if item:
+                item.paths.extend(p for p in paths if p not in item.paths)
+                item.devices.extend(d for d in devices if d not in item.devices)
+                item.sources.append(source)
+                self._stats["coalesced"] += 1
+                return item.future
+            if self.limit and len(self._queue) >= self.limit and not self._stopped:
+                self._stats["blocked"] += 1
+                started = time.monotonic()
+                while len(self._queue) >= self.limit and not self._stopped:
+                    self._cond.wait()
+                self._stats["blocked_seconds"] += time.monotonic() - started
+                # 等待期間可能已有相同路徑入隊
+                item = self._queue.get(path)
+                if item:
+                    item.sources.append(source)
+                    self._stats["coalesced"] += 1
+                    return item.future
+            future = Future()
+            if self._stopped:
+                future.cancel()
+                return future
+            self._queue[path] = _WorkItem(path=path, future=future, paths=paths, devices=devices,
+                                          enqueued=time.monotonic(), sources=[source])
+            self._stats["submitted"] += 1
+            self._stats["max_depth"] = max(self._stats["max_depth"], len(self._queue))
+            self._cond.notify_all()
+            return future
+
+    def stats(self) -> Dict[str, Any]:
+        """隊列深度與背壓統計"""
+        with self._cond:
+            now = time.monotonic()
+            oldest = next(iter(self._queue.values()), None)
+            return dict(self._stats,
+                        depth=len(self._queue),
+                        running=len(self._running),
+                        workers=self.workers,
+                        limit=self.limit,
+                        oldest_wait_seconds=round(now - oldest.enqueued, 1) if oldest else 0.0,
+                        blocked_seconds=round(self._stats["blocked_seconds"], 1))
+
+    def _next(self) -> Optional[_WorkItem]:
+        """按提交順序取第一個可執行的任務：同一路徑不並行處理，所涉及設備需有空閒名額"""
+        for path, item in self._queue.items():
+            if path in self._running:
+                continue
+            if self._scheduler and not self._scheduler.try_acquire(item.devices):
+                continue
+            del self._queue[path]
+            return item
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                item = None
+                while not self._stopped:
+                    item = self._next()
+                    if item:
+                        break
+                    # 設備名額也可能被隊列外的任務（如API生成種子）釋放，定期重試
+                    self._cond.wait(timeout=1.0)
+                if not item:
+                    return
+                self._running[item.path] = item
+                # 隊列出現空位，喚醒被背壓阻塞的提交方
+                self._cond.notify_all()
+            if not item.future.set_running_or_notify_cancel():
+                result, error = None, None
+            else:
+                try:
+                    result, error = self._func(item.path), None
+                except Exception as e:
+                    logger.error(f"PT种子生成器 處理 {item.path} 失敗: {e}")
+                    result, error = None, e
+            if self._scheduler:
+                self._scheduler.release(item.devices)
+            with self._cond:
+                del self._running[item.path]
+                self._stats["completed" if error is None and result else "failed"] += 1
+                self._cond.notify_all()
+            if error is not None:
+                item.future.set_exception(error)
+            elif item.future.running():
+                item.future.set_result(result)